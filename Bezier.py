@@ -11,7 +11,9 @@ from https://github.com/Pomax/BezierInfo-2
 
 import math
 import types
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
+import numpy as np
+from scipy.spatial import cKDTree
 import BezierUtilities as butils
 import PathUtilities
 import CurveFitting
@@ -26,6 +28,19 @@ class Bezier(object):
     dir_up = 1
     dir_down = 2
 
+    # Set this to True to compute lengths with Decimal
+    # arithmetic instead of floats by default. The length
+    # property returned a Decimal before lengths were computed
+    # with floats, so code that needs a Decimal can set this.
+    exactLength = False
+
+    # The precision, in t, of the ends of the pieces made by reduce()
+    reduceTolerance = 0.001
+
+    # The limits on the work done by the curve intersection code
+    intersectionMaxIterations = 4096
+    intersectionMaxDepth = 64
+
     def __init__(self, controlPoints):
         self._controlPoints = controlPoints
         self._t1 = 0
@@ -33,22 +48,26 @@ class Bezier(object):
         self._dcPoints = None
         self._extrema = None
         self._length = None
+        self._exactLength = None
         self._bbox = None
         self._boundsRectangle = None
+        self._coefficients = None
         self._lut = []
-
-        self._direction = self._computeDirection()
-
-        # a bit of a hack to deal with the fact that control points
-        # are sometimes Decimal values...
-        def fp(p): return (float(p[0]), float(p[1]))
-
-        cp = [fp(p) for p in self.controlPoints]
-        aligned = self._align(cp, [cp[0], cp[-1]])
-        self._linear = len([x for x in aligned if abs(x[1]) > 0.0001]) == 0
-
-        angle = butils.angle(cp[0], cp[-1], cp[1])
-        self._clockwise = angle > 0
+        self._lutArray = None
+        self._reduced = None
+
+        # these are computed when they're first used
+        self._direction = None
+        self._linear = None
+        self._clockwise = None
+
+    def prepare(self):
+        """\
+        Compute all of the lazily computed state of the curve now,
+        for callers that know they'll use it. Returns the curve.
+        """
+        _ = self.direction, self.linear, self.clockwise, self.boundsRectangle
+        return self
 
     def _computeDirection(self):
         p0x, p0y = self._controlPoints[0]
@@ -266,6 +285,32 @@ class Bezier(object):
     def get(self, t):
         return self._compute(t)
 
+    @property
+    def coefficients(self):
+        """\
+        The power basis coefficients of the curve: an (order + 1 x 2) array C
+        such that B(t) = [1, t, t², ..., t^order] · C
+        """
+        if self._coefficients is None:
+            cp = np.array(self._controlPoints, dtype=float)
+            self._coefficients = butils.powerBasisMatrix(self.order) @ cp
+
+        return self._coefficients
+
+    def evaluate(self, ts):
+        """\
+        Evaluate the curve at all of the parameter values in ts at once.
+        Returns an (N x 2) array of points.
+        """
+        ts = np.asarray(ts, dtype=float)
+        points = butils.powers(ts, self.order) @ self.coefficients
+
+        # like _compute(), return the end points exactly
+        points[ts == 0] = np.array(self._controlPoints[0], dtype=float)
+        points[ts == 1] = np.array(self._controlPoints[-1], dtype=float)
+
+        return points
+
     @staticmethod
     def _align(points, segment):
         angle = PathUtilities.rawSlopeAngle(segment)
@@ -282,8 +327,48 @@ class Bezier(object):
 
     @property
     def direction(self):
+        if self._direction is None:
+            self._direction = self._computeDirection()
+
         return self._direction
 
+    # a bit of a hack to deal with the fact that control points
+    # are sometimes Decimal values...
+    def _floatPoints(self):
+        return [(float(x), float(y)) for x, y in self._controlPoints]
+
+    @property
+    def linear(self):
+        """\
+        True if all of the control points are on the line
+        from the start point to the end point.
+        """
+        if self._linear is None:
+            cp = self._floatPoints()
+            sx, sy = cp[0]
+            dx = cp[-1][0] - sx
+            dy = cp[-1][1] - sy
+            d = math.hypot(dx, dy)
+
+            # the distance of each point from the line, using the cross product.
+            # if the end points are the same, the line is horizontal.
+            if d != 0:
+                distances = [abs(dx * (py - sy) - dy * (px - sx)) / d for px, py in cp]
+            else:
+                distances = [abs(py - sy) for _, py in cp]
+
+            self._linear = max(distances) <= 0.0001
+
+        return self._linear
+
+    @property
+    def clockwise(self):
+        if self._clockwise is None:
+            cp = self._floatPoints()
+            self._clockwise = butils.angle(cp[0], cp[-1], cp[1]) > 0
+
+        return self._clockwise
+
     @property
     def midpoint(self):
         return self.get(0.5)
@@ -332,7 +417,9 @@ class Bezier(object):
         return self._extrema
 
     def overlaps(self, curve):
-        return self.boundsRectangle.intersection(curve.boundsRectangle) is not None
+        (minX1, maxX1), (minY1, maxY1) = self.bbox[0], self.bbox[1]
+        (minX2, maxX2), (minY2, maxY2) = curve.bbox[0], curve.bbox[1]
+        return minX1 <= maxX2 and minX2 <= maxX1 and minY1 <= maxY2 and minY2 <= maxY1
 
     def hull(self, t):
         p = self.controlPoints
@@ -350,15 +437,21 @@ class Bezier(object):
         return q
 
     # LUT == LookUp Table
+    def getLUTArray(self, steps=100):
+        if self._lutArray is not None and len(self._lutArray) == steps: return self._lutArray
+
+        # We want a range from 0 to 1 inclusive, with the end points exact, like evaluate()
+        lutArray = butils.lutPowers(steps, self.order) @ self.coefficients
+        lutArray[0] = self._controlPoints[0]
+        lutArray[-1] = self._controlPoints[-1]
+        self._lutArray = lutArray
+
+        return self._lutArray
+
     def getLUT(self, steps=100):
         if len(self._lut) == steps: return self._lut
 
-        self._lut = []
-        # We want a range from 0 to 1 inclusive, so
-        # we decrement steps and use range(steps+1)
-        steps -= 1
-        for t in range(steps+1):
-            self._lut.append(self.get(t / steps))
+        self._lut = [tuple(p) for p in self.getLUTArray(steps).tolist()]
 
         return self._lut
 
@@ -378,48 +471,91 @@ class Bezier(object):
     def xyPoint(cls, x, y):
         return x, y
 
-    @property
-    def length(self):
-        if not self._length:
-            z = Decimal(0.5)
-            sum = Decimal(0)
+    def arcLength(self, exact=None):
+        """\
+        Return the length of the curve, using 24 point Legendre-Gauss quadrature.
+        If exact is True, the computation uses Decimal arithmetic, otherwise it uses
+        floats. If exact is None, Bezier.exactLength selects the arithmetic.
+        """
+        if exact is None: exact = Bezier.exactLength
+
+        if exact:
+            if self._exactLength is None:
+                z = Decimal(0.5)
+                sum = Decimal(0)
 
-            getcontext().prec += 2
-            for i in range(len(butils.tValues)):
-                t = butils.tValues[i].fma(z, z)
-                sum = butils.cValues[i].fma(self._arcfun(t), sum)
+                # add the extra digits in a local context, so the caller's precision never changes
+                with localcontext() as context:
+                    context.prec += 2
+                    for i in range(len(butils.tValues)):
+                        t = butils.tValues[i].fma(z, z)
+                        sum = butils.cValues[i].fma(self._arcfun(t), sum)
 
-            length = z * sum
-            getcontext().prec -= 2
-            self._length = +length
+                    length = z * sum
+
+                self._exactLength = +length
+
+            return self._exactLength
+
+        if self._length is None:
+            lengths([self])
 
         return self._length
 
+    @property
+    def length(self):
+        """\
+        The length of the curve. This is a float, unless Bezier.exactLength
+        is True, in which case it's a Decimal, as it was before lengths were
+        computed with floats. The two agree to within 1e-9 of the length.
+        """
+        return self.arcLength()
+
+    def _piece(self, controlPoints, t1, t2):
+        # a piece of this curve from t1 to t2, with
+        # the _t1/_t2 information bound to match
+        piece = Bezier(controlPoints)
+        piece._t1 = butils.map(t1, 0, 1, self._t1, self._t2)
+        piece._t2 = butils.map(t2, 0, 1, self._t1, self._t2)
+        return piece
+
     def split(self, t1, t2=None):
+        """\
+        If t2 is None, return a tuple of the pieces of the curve before and
+        after t1, and the curve's hull at t1. Otherwise, return the piece of
+        the curve from t1 to t2. Computing the hull costs more than the split
+        itself, so callers that only need the pieces should use splitAt([t1]).
+        """
         # shortcuts...
-        if t1 == 0 and t2: return self.split(t2)[0]
-        if t2 == 1: return self.split(t1)[1]
+        if t1 == 0 and t2: return self._piece(butils.splitPoints(self.controlPoints, t2)[0], 0, t2)
+        if t2 == 1: return self._piece(butils.splitPoints(self.controlPoints, t1)[1], t1, 1)
 
-        # no shortcut: use "de Casteljau" iteration.
-        q = self.hull(t1)
-        if self.order == 2:
-            left = Bezier([q[0], q[3], q[5]])
-            right = Bezier([q[5], q[4], q[2]])
-        else:
-            left = Bezier([q[0], q[4], q[7], q[9]])
-            right = Bezier([q[9], q[8], q[6], q[3]])
-
-        # make sure we bind _t1/_t2 information!
-        left._t1 = butils.map(0, 0, 1, self._t1, self._t2)
-        left._t2 = butils.map(t1, 0, 1, self._t1, self._t2)
-        right._t1 = butils.map(t1, 0, 1, self._t1, self._t2)
-        right._t2 = butils.map(1, 0, 1, self._t1, self._t2)
+        left, right = butils.splitPoints(self.controlPoints, t1)
 
         # if we have no t2, we're done
-        if not t2: return (left, right, q)
+        if not t2: return (self._piece(left, 0, t1), self._piece(right, t1, 1), self.hull(t1))
+
+        left, _ = butils.splitPoints(right, butils.map(t2, t1, 1, 0, 1))
+        return self._piece(left, t1, t2)
+
+    def splitAt(self, ts):
+        """\
+        Split the curve at all of the values in ts. Returns a list of
+        the pieces, in order. Values outside of (0, 1) are ignored.
+        """
+        pieces = []
+        points = self.controlPoints
+        start = 0
+
+        for t in sorted(set(ts)):
+            if t <= 0 or t >= 1: continue
 
-        t2 = butils.map(t2, t1, 1, 0, 1)
-        return right.split(t2)[0]
+            left, points = butils.splitPoints(points, butils.map(t, start, 1, 0, 1))
+            pieces.append(self._piece(left, start, t))
+            start = t
+
+        pieces.append(self._piece(points, start, 1))
+        return pieces
 
     def roots(self, segment=None):
 
@@ -428,88 +564,7 @@ class Bezier(object):
         else:
             p = self.controlPoints
 
-        def reduce(t):
-            return 0 <= t <= 1 or butils.approximately(t, 0) or butils.approximately(t, 1)
-
-        order = len(p) - 1
-        if order == 2:
-            a = p[0][1]
-            b = p[1][1]
-            c = p[2][1]
-            d = a - 2 * b + c
-            if d != 0:
-                m1 = -butils.sqrt(b * b - a * c)
-                m2 = -a + b
-                v1 = -(m1 + m2) / d
-                v2 = -(-m1 + m2) / d
-                return list(filter(reduce, [v1, v2]))
-            elif b != c and d == 0:
-                return list(filter(reduce, [(2 * b - c) / (2 * b - 2 * c)]))
-
-            return []
-
-        # see http://www.trans4mind.com/personal_development/mathematics/polynomials/cubicAlgebra.htm
-        pa = p[0][1]
-        pb = p[1][1]
-        pc = p[2][1]
-        pd = p[3][1]
-
-        d = -pa + 3 * pb - 3 * pc + pd
-        a = 3 * pa - 6 * pb + 3 * pc
-        b = -3 * pa + 3 * pb
-        c = pa
-
-        if butils.approximately(d, 0):
-            # this is not a cubic curve.
-            if butils.approximately(a, 0):
-                # in fact, this is not a quadratic curve either.
-                if butils.approximately(b, 0):
-                    # in fact, there are no solutions
-                    return []
-
-                # linear solution:
-                return list(filter(reduce, [-c / b]))
-
-            # quadratic solution:
-            q = butils.sqrt(b * b - 4 * a * c)
-            a2 = 2 * a
-            return list(filter(reduce, [(q - b) / a2, (-b - q) / a2]))
-
-        # at this point, we know we need a cubic solution:
-        a /= d
-        b /= d
-        c /= d
-
-        p = (3 * b - a * a) / 3
-        p3 = p / 3
-        q = (2 * a * a * a - 9 * a * b + 27 * c) / 27
-        q2 = q / 2
-        discriminant = q2 * q2 + p3 * p3 * p3
-
-        if discriminant < 0:
-            mp3 = -p / 3
-            mp33 = mp3 * mp3 * mp3
-            r = butils.sqrt(mp33)
-            t = -q / (2 * r)
-            # cosphi = t < -1 ? -1: t > 1 ? 1: t
-            cosphi = -1 if t < -1 else 1 if t > 1 else t
-            phi = math.acos(cosphi)
-            crtr = butils.crt(r)
-            t1 = 2 * crtr
-            x1 = t1 * math.cos(phi / 3) - a / 3
-            x2 = t1 * math.cos((phi + butils.tau) / 3) - a / 3
-            x3 = t1 * math.cos((phi + 2 * butils.tau) / 3) - a / 3
-            return list(filter(reduce, [x1, x2, x3]))
-        elif butils.approximately(discriminant, 0):  # discriminant == 0:
-            u1 = butils.crt(-q2) if q2 < 0 else -butils.crt(q2)
-            x1 = 2 * u1 - a / 3
-            x2 = -u1 - a / 3
-            return list(filter(reduce, [x1, x2]))
-        else:
-            sd = butils.sqrt(discriminant)
-            u1 = butils.crt(-q2 + sd)
-            v1 = butils.crt(q2 + sd)
-            return list(filter(reduce, [u1 - v1 - a / 3]))
+        return butils.roots([y for _, y in p])
 
     def align(self, segment=None):
         if not segment:
@@ -529,57 +584,64 @@ class Bezier(object):
             a2 = butils.angle(self.controlPoints[0], self.controlPoints[3], self.controlPoints[2])
             if (a1 > 0 and a2 < 0) or (a1 < 0 and a2 > 0): return False
 
-        n1x, n1y = self.normal(0)
-        n2x, n2y = self.normal(1)
-        s = n1x * n2x + n1y * n2y
+        try:
+            n1x, n1y = self.normal(0)
+            n2x, n2y = self.normal(1)
+        except ZeroDivisionError:
+            # the curve has no direction at one of its ends
+            return False
+
+        # rounding can push the dot product of the unit normals just outside [-1, 1]
+        s = max(-1, min(1, n1x * n2x + n1y * n2y))
         return abs(math.acos(s)) < math.pi / 3
 
+    def _simpleSpan(self, t1):
+        # Find the largest t2 such that the piece of this curve from t1 to t2
+        # is simple, by bisecting toward the point where it stops being simple.
+        # Returns t1 if there's no simple piece that starts at t1.
+        def simplePiece(t2): return Bezier(butils.clipPoints(self.controlPoints, t1, t2)).simple()
+
+        if simplePiece(1): return 1
+
+        lo = t1
+        hi = 1
+        while hi - lo > self.reduceTolerance:
+            mid = (lo + hi) / 2
+            if simplePiece(mid):
+                lo = mid
+            else:
+                hi = mid
+
+        return lo
+
     def reduce(self):
-        pass1 = []
-        pass2 = []
+        if self._reduced is not None: return self._reduced
 
         # first pass: split on extrema
-        extrema = self.extrema[2]
-        if not 0 in extrema: extrema.insert(0, 0)
-        if not 1 in extrema: extrema.append(1)
-
-        t1 = extrema[0]
-        for i in range(1, len(extrema)):
-            t2 = extrema[i]
-            segment = self.split(t1, t2)
+        extrema = [t for t in self.extrema[2] if 0 < t < 1]
+        pass1 = self.splitAt(extrema)
+
+        # the pieces' t values are relative to this curve
+        bounds = [0] + sorted(set(extrema)) + [1]
+        for segment, t1, t2 in zip(pass1, bounds, bounds[1:]):
             segment._t1 = t1
             segment._t2 = t2
-            pass1.append(segment)
-            t1 = t2
 
         # second pass: further reduce these segments to simple segments
-        step = 0.01
+        pass2 = []
         for p1 in pass1:
             t1 = 0
-            t2 = 0
-            while t2 <= 1:
-                t2 = t1 + step
-                while t2 <= 1:
-                    segment = p1.split(t1, t2)
-                    if not segment.simple():
-                        t2 -= step
-                        if abs(t1 - t2) < step:
-                            # we can never form a reduction
-                            return []
-                        segment = p1.split(t1, t2)
-                        segment._t1 = butils.map(t1, 0, 1, p1._t1, p1._t2)
-                        segment._t2 = butils.map(t2, 0, 1, p1._t1, p1._t2)
-                        pass2.append(segment)
-                        t1 = t2
-                        break
-                    t2 += step
-
-            if t1 < 1:
-                segment = p1.split(t1, 1)
-                segment._t1 = butils.map(t1, 0, 1, p1._t1, p1._t2)
-                segment._t2 = p1._t2
-                pass2.append(segment)
+            while t1 < 1:
+                t2 = p1._simpleSpan(t1)
+                if t2 <= t1:
+                    # we can never form a reduction
+                    self._reduced = []
+                    return self._reduced
 
+                pass2.append(p1._piece(butils.clipPoints(p1.controlPoints, t1, t2), t1, t2))
+                t1 = t2
+
+        self._reduced = pass2
         return pass2
 
     def lineIntersects(self, line):
@@ -619,7 +681,8 @@ class Bezier(object):
         # step 2: for each pairing, run through the convergence algorithm.
         intersections = []
         for pair in pairs:
-            result = butils.pairiteration(pair[0], pair[1], intersectionThreshold)
+            result = butils.pairiteration(pair[0], pair[1], intersectionThreshold,
+                                          Bezier.intersectionMaxIterations, Bezier.intersectionMaxDepth)
             if len(result) > 0:
                 intersections.extend(result)
 
@@ -636,7 +699,7 @@ class Bezier(object):
         for i in range(length):
             left = reduced[i]
             right = reduced[i+2:]
-            result = Bezier.curveIntersects(left, right, intersectionThreshold)
+            result = Bezier.curveIntersects([left], right, intersectionThreshold)
             results.extend(result)
 
         return results
@@ -644,9 +707,9 @@ class Bezier(object):
     def intersects(self, curve, intersectionThreshold=0.5):
         if curve is None: return self.selfIntersects(intersectionThreshold)
         # if curve is a line: self.lineIntersects(line, intersectionThreshold)
-        #if curve instanceOf Bezier: curve = curve.reduce()
 
-        return Bezier.curveIntersects(self.reduce(), curve.reduce(), intersectionThreshold)
+        # Bézier clipping doesn't need the curves to be reduced to simple curves first
+        return Bezier.curveIntersects([self], [curve], intersectionThreshold)
 
     def getABC(self, t):
         hull = self.hull(t)
@@ -679,7 +742,7 @@ class Bezier(object):
 
     def offset(self, t, d=None):
         def rp(r):
-            if r._linear:
+            if r.linear:
                 return r.offset(t)[0]
             return r.scale(t)
 
@@ -690,7 +753,7 @@ class Bezier(object):
             py = cy + ny * d
             return [c, n, (px, py)]
 
-        if self._linear:
+        if self.linear:
             nv = self.normal(0)
             coords = list(map(lambda p: (p[0] + t * nv[0], p[1] + t * nv[1]), self.controlPoints))
             return [Bezier(coords)]
@@ -708,7 +771,7 @@ class Bezier(object):
         if distanceFn and order == 2: return self.raiseOrder().scale(distanceFn)
 
         # TODO: add special handling for degenerate (=linear) curves.
-        clockwise = self._clockwise
+        clockwise = self.clockwise
         r1 = distanceFn(0) if distanceFn else d
         r2 = distanceFn(1) if distanceFn else d
         v = [self.offset(0, 10), self.offset(1, 10)]
@@ -756,19 +819,12 @@ class Bezier(object):
 
 class BContour(object):
     def __init__(self, contour):
-        beziers = []
-        bounds = PathUtilities.GTBoundsRectangle()
-
-        for segment in contour:
-            bezier = Bezier(segment)
-            bounds = bounds.union(bezier.boundsRectangle)
-            beziers.append(bezier)
-
-        self._beziers = beziers
-        self._bounds = bounds
+        self._beziers = [Bezier(segment) for segment in contour]
+        self._bounds = None
         self._lut = []
-        self._start = beziers[0].start
-        self._end = beziers[-1].end
+        self._index = None
+        self._start = self._beziers[0].start
+        self._end = self._beziers[-1].end
 
     def __getitem__(self, index):
         return self._beziers[index]
@@ -776,12 +832,18 @@ class BContour(object):
     def __setitem__(self, index, value):
         self._beziers[index] = Bezier(value)
         # self._length = None
+        self._bounds = None
+        self._lut = []
+        self._index = None
         self._start = self._beziers[0].start
         self._end = self._beziers[-1].end
 
     def __delitem__(self, index):
         del self._beziers[index]
         # self._length = None
+        self._bounds = None
+        self._lut = []
+        self._index = None
         self._start = self._beziers[0].start
         self._end = self._beziers[-1].end
 
@@ -791,96 +853,98 @@ class BContour(object):
     def getLUT(self, steps=100):
         if len(self._lut) == steps: return self._lut
 
-        self._lut = []
-        startPoint = 0
-        for curve in self._beziers:
-            self._lut.extend(curve.getLUT(steps)[startPoint:])
-            # for every curve but the first, the first point is
-            # the same as the last point of the last curve
-            startPoint = 1
+        self._lut = [tuple(p) for p in self.getLUTArray(steps).tolist()]
 
         return self._lut
 
-    @classmethod
-    def _findClosest(cls, point, LUT):
-        x, y = point
-        closest = MAX_SAFE_INTEGER
-        for index in range(len(LUT)):
-            px, py = LUT[index]
-            dist = math.hypot(px - x, py - y)
-            if dist < closest:
-                closest = dist
-                i = index
-
-        return i
-
-    @classmethod
-    def _refineBinary(cls, point, curve, LUT, i):
-        closest = MAX_SAFE_INTEGER
-        steps = len(LUT)
-        TT = [t / (steps - 1) for t in range(steps)]
-        px, py = point
-
-        for _ in range(25):  # This is for safety; the loop should always break
-            steps = len(LUT)
-            i1 = 0 if i == 0 else i - 1
-            i2 = i if i == steps - 1 else i + 1
-            t1 = TT[i1]
-            t2 = TT[i2]
-            lut = []
-            tt = []
-            step = (t2 - t1) / 5
-
-            if step < 0.001: break
-            lut.append(LUT[i1])
-            tt.append(TT[i1])
-            for j in range(1, 4):
-                nt = t1 + (j * step)
-                nx, ny = n = curve.get(nt)
-                dist = math.hypot(nx - px, ny - py)
-                if dist < closest:
-                    closest = dist
-                    q = n
-                    i = j
-                lut.append(n)
-                tt.append(nt)
-            lut.append(LUT[i2])
-            tt.append(TT[i2])
-
-            # update the LUT to be our new five point LUT, and run again.
-            LUT = lut
-            TT = tt
-
-        return (q, closest)
+    def getLUTArray(self, steps=100):
+        # for every curve but the first, the first point is
+        # the same as the last point of the last curve
+        luts = [curve.getLUTArray(steps)[0 if i == 0 else 1:] for i, curve in enumerate(self._beziers)]
+
+        return np.concatenate(luts)
+
+    def _lutIndex(self, steps):
+        # A KD-tree over the points in the contour's LUT, along with the
+        # index of the curve that each point came from, and its index in
+        # that curve's LUT.
+        if self._index is None or self._index[0] != steps:
+            curveIndices = []
+            lutIndices = []
+            for c in range(len(self._beziers)):
+                first = 0 if c == 0 else 1
+                curveIndices.extend([c] * (steps - first))
+                lutIndices.extend(range(first, steps))
+
+            tree = cKDTree(self.getLUTArray(steps))
+            self._index = (steps, tree, curveIndices, lutIndices)
+
+        return self._index[1:]
+
+    def projectPoints(self, points, steps):
+        """\
+        Find the closest point on the contour to each of the given points,
+        by looking up the closest LUT sample and then projecting the point onto
+        that sample's curve, between the samples on either side of it.
+
+        Returns a tuple of (N) arrays of the indices of the closest curves,
+        the t values on those curves and the distances, and an (N x 2) array
+        of the closest points.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        tree, curveIndices, lutIndices = self._lutIndex(steps)
+        _, indices = tree.query(points)
+
+        s1 = steps - 1
+        queries = []
+        queryCurves = []
+        ts = []
+        lows = []
+        highs = []
+        for n, index in enumerate(indices.tolist()):
+            ix = curveIndices[index]
+            i = lutIndices[index]
+            queries.append((n, ix))
+            queryCurves.append(self._beziers[ix])
+            ts.append(i / s1)
+            lows.append(max(i - 1, 0) / s1)
+            highs.append(min(i + 1, s1) / s1)
+
+            # the closest point might be on the next curve
+            if i == s1 and ix < len(self._beziers) - 1:
+                queries.append((n, ix + 1))
+                queryCurves.append(self._beziers[ix + 1])
+                ts.append(0)
+                lows.append(0)
+                highs.append(1 / s1)
+
+        qts, qDistances, qPoints = projectPoints(points[[n for n, _ in queries]], queryCurves, ts, lows, highs)
+
+        closestCurves = np.empty(len(points), dtype=int)
+        closestTs = np.empty(len(points))
+        distances = np.full(len(points), np.inf)
+        closestPoints = np.empty((len(points), 2))
+        for q, (n, ix) in enumerate(queries):
+            if qDistances[q] < distances[n]:
+                closestCurves[n] = ix
+                closestTs[n] = qts[q]
+                distances[n] = qDistances[q]
+                closestPoints[n] = qPoints[q]
+
+        return closestCurves, closestTs, distances, closestPoints
+
+    def findClosestPoints(self, points, steps):
+        """\
+        Find the closest point on the contour to each of the given points.
+        Returns a tuple of an (N) array of the distances and an (N x 2) array
+        of the closest points.
+        """
+        _, _, distances, closestPoints = self.projectPoints(points, steps)
+        return distances, closestPoints
 
     def findClosestPoint(self, point, steps):
-        nCurves = len(self.beziers)
-        curve2 = None
-        i = self._findClosest(point, self.getLUT(steps))
-
-        if i < steps:
-            curve = self.beziers[0]
-            if i == steps - 1 and nCurves >= 2: curve2 = self.beziers[1]
-        else:
-            i -= steps
-            s1 = steps - 1
-            ix = i // s1 + 1
-            curve = self.beziers[ix]
-            if ix < nCurves - 1: curve2 = self.beziers[ix + 1]
-            i %= s1
-
-        LUT = curve.getLUT(steps)
-        cip, closest = self._refineBinary(point, curve, LUT, i)
-
-        if curve2:
-            LUT = curve2.getLUT(steps)
-            cip2, c2 = self._refineBinary(point, curve2, LUT, 0)
-
-            if c2 < closest:
-                closest = c2
-                cip = cip2
-
-        return (closest, cip)
+        distances, closestPoints = self.findClosestPoints([point], steps)
+        return (float(distances[0]), tuple(closestPoints[0].tolist()))
 
     def pointToString(self, point):
         return ",".join([str(i) for i in point])
@@ -948,8 +1012,24 @@ class BContour(object):
 
     @property
     def boundsRectangle(self):
+        if self._bounds is None:
+            bounds = PathUtilities.GTBoundsRectangle()
+            for bezier in self._beziers:
+                bounds.unionInPlace(bezier.boundsRectangle)
+
+            self._bounds = bounds
+
         return self._bounds
 
+    def prepare(self):
+        """\
+        Compute the lazily computed state of all of the
+        curves in the contour now. Returns the contour.
+        """
+        for bezier in self._beziers: bezier.prepare()
+        _ = self.boundsRectangle
+        return self
+
     @property
     def beziers(self):
         return self._beziers
@@ -964,16 +1044,17 @@ class BContour(object):
 
 class BOutline(object):
     def __init__(self, contours):
-        bounds = PathUtilities.GTBoundsRectangle()
-        bContours = []
-
-        for contour in contours:
-            bc = BContour(contour)
-            bContours.append(bc)
-            bounds = bounds.union(bc.boundsRectangle)
-
-        self._bContours = bContours
-        self._bounds = bounds
+        self._bContours = [BContour(contour) for contour in contours]
+        self._bounds = None
+
+    def prepare(self):
+        """\
+        Compute the lazily computed state of all of the
+        contours in the outline now. Returns the outline.
+        """
+        for bContour in self._bContours: bContour.prepare()
+        _ = self.boundsRectangle
+        return self
 
     def __iter__(self):
         return self._bContours.__iter__()
@@ -1015,6 +1096,13 @@ class BOutline(object):
 
     @property
     def boundsRectangle(self):
+        if self._bounds is None:
+            bounds = PathUtilities.GTBoundsRectangle()
+            for bContour in self._bContours:
+                bounds.unionInPlace(bContour.boundsRectangle)
+
+            self._bounds = bounds
+
         return self._bounds
 
 def drawCurve(cp, curve, color=None):
@@ -1033,6 +1121,101 @@ def drawOutline(cp, outline, color=None):
         drawContour(cp, bc, color=color)
         drawContour(cp, bc, color=color)
 
+def lengths(curves):
+    """\
+    Return a list of the lengths of the given curves, for example all of
+    the curves in an outline. The lengths are computed with float Legendre-Gauss
+    quadrature, in one vectorized pass for all of the curves of each order,
+    and are also cached in the curves.
+    """
+    curves = list(curves)
+    curvesByOrder = {}
+    for index, curve in enumerate(curves):
+        curvesByOrder.setdefault(curve.order, []).append(index)
+
+    ts = butils.tValuesFloat * 0.5 + 0.5
+    result = [0.0 for _ in curves]
+    for order, indices in curvesByOrder.items():
+        if order == 0: continue
+
+        # the power basis coefficients of the derivatives of the curves
+        coefficients = np.stack([curves[i].coefficients[1:] for i in indices])
+        coefficients *= np.arange(1, order + 1)[:, np.newaxis]
+
+        derivatives = np.einsum("qk,ckd->cqd", butils.powers(ts, order - 1), coefficients)
+        speeds = np.hypot(derivatives[..., 0], derivatives[..., 1])
+
+        for index, length in zip(indices, (speeds @ butils.cValuesFloat * 0.5).tolist()):
+            curves[index]._length = length
+            result[index] = length
+
+    return result
+
+def projectPoints(points, curves, ts, lows=None, highs=None, iterations=20):
+    """\
+    Project each point in points onto the corresponding curve in curves, starting
+    from the corresponding value in ts and staying within [lows[i], highs[i]],
+    which default to [0, 1]. All of the projections are done at once, with Newton's
+    method on the derivative of the squared distance. Steps that would leave the
+    bracket, or that head toward a maximum, are replaced by bisection.
+
+    Returns a tuple of (N) arrays of the t values and the distances, and an
+    (N x 2) array of the projected points.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    n = len(points)
+    ts = np.array(ts, dtype=float)
+    lows = np.zeros(n) if lows is None else np.array(lows, dtype=float)
+    highs = np.ones(n) if highs is None else np.array(highs, dtype=float)
+    firstLows = lows.copy()
+    firstHighs = highs.copy()
+
+    # the power basis coefficients of all of the curves, padded with zeros to the same order
+    order = max(curve.order for curve in curves)
+    coefficients = np.zeros((n, order + 1, 2))
+    for i, curve in enumerate(curves):
+        coefficients[i, :curve.order + 1] = curve.coefficients
+
+    k = np.arange(order + 1)
+    d1 = coefficients[:, 1:] * k[1:, np.newaxis]
+    d2 = d1[:, 1:] * k[1:-1, np.newaxis]
+
+    def evaluate(c, t):
+        return np.einsum("nk,nkd->nd", np.power.outer(t, np.arange(c.shape[1])), c)
+
+    for _ in range(iterations):
+        # the curves and both derivatives at ts, using one set of powers of ts
+        tPowers = np.power.outer(ts, k)
+        delta = np.einsum("nk,nkd->nd", tPowers, coefficients) - points
+        derivative = np.einsum("nk,nkd->nd", tPowers[:, :-1], d1)
+        second = np.einsum("nk,nkd->nd", tPowers[:, :-2], d2)
+        f = np.einsum("nd,nd->n", delta, derivative)
+        fPrime = np.einsum("nd,nd->n", derivative, derivative) + np.einsum("nd,nd->n", delta, second)
+
+        # f is the derivative of half the squared distance, so the minimum
+        # is after ts where it's negative, and before ts where it's positive
+        lows = np.where(f < 0, ts, lows)
+        highs = np.where(f > 0, ts, highs)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = ts - f / fPrime
+        useNewton = (fPrime > 0) & (newton > lows) & (newton < highs)
+        newTs = np.where(useNewton, newton, (lows + highs) / 2)
+        newTs = np.where(f == 0, ts, newTs)
+
+        converged = np.abs(newTs - ts) < 1e-12
+        ts = newTs
+        if converged.all(): break
+
+    # the closest point might be at one of the ends of the starting bracket
+    candidates = np.stack([ts, firstLows, firstHighs], axis=1)
+    candidatePoints = np.stack([evaluate(coefficients, candidates[:, j]) for j in range(3)], axis=1)
+    candidateDistances = np.hypot(*(candidatePoints - points[:, np.newaxis]).transpose(2, 0, 1))
+    best = np.argmin(candidateDistances, axis=1)
+    rows = np.arange(n)
+
+    return candidates[rows, best], candidateDistances[rows, best], candidatePoints[rows, best]
+
 def fitCurveToPoints(points, polygonal=True):
     p, m, s, c = CurveFitting.fit(points, polygonal=polygonal)
     cx, cy = c
@@ -1042,6 +1225,13 @@ def fitCurveToPoints(points, polygonal=True):
 
     return Bezier(bpoints)
 
+def fitCurvesToPoints(points, maxError=0.5, chunkSize=256):
+    """\
+    Return a list of cubic Beziers that fit the points to within maxError.
+    See CurveFitting.fitPiecewise for details.
+    """
+    return [Bezier(curve) for curve in CurveFitting.fitPiecewise(points, maxError, chunkSize)]
+
 def getDefaultQuadratic():
     qPoints = [(70, 50), (20, 190), (250, 240)]
     return Bezier(qPoints)
@@ -1050,9 +1240,39 @@ def getDefaultCubic():
     cPoints = [(120, 140), (35, 100), (220, 40), (220, 260)]
     return Bezier(cPoints)
 
+def testLength():
+    curves = [
+        Bezier([(90, 140), (25, 210), (230, 210), (150, 10)]),
+        Bezier([(70, 0), (20, 140), (250, 190)]),
+    ]
+
+    for curve in curves:
+        length = curve.length
+        exact = curve.arcLength(exact=True)
+        assert type(length) == float, f"length is a {type(length).__name__}, not a float"
+        assert type(exact) == Decimal, f"exact length is a {type(exact).__name__}, not a Decimal"
+        assert abs(length - float(exact)) <= 1e-9 * float(exact), f"length {length} != exact length {exact}"
+
+    # the Decimal computation only handles curves, so check a line against its distance
+    line = Bezier([(0, 50), (100, 200)])
+    assert abs(line.length - math.hypot(100, 150)) <= 1e-9, f"line length {line.length} != {math.hypot(100, 150)}"
+    curves.append(line)
+
+    # lengths() computes the same lengths for a mix of orders in one pass
+    for curve, length in zip(curves, lengths([Bezier(curve.controlPoints) for curve in curves])):
+        assert length == curve.length, f"batched length {length} != length {curve.length}"
+
+    Bezier.exactLength = True
+    try:
+        assert type(Bezier(curves[0].controlPoints).length) == Decimal, "length isn't a Decimal when Bezier.exactLength is set"
+    finally:
+        Bezier.exactLength = False
+
 def test():
     from FontDocTools import GlyphPlotterEngine
 
+    testLength()
+
     colorRed = PathUtilities.GTColor.fromName("red")
     colorGreen = PathUtilities.GTColor.fromName("green")
     colorBlue = PathUtilities.GTColor.fromName("blue")
@@ -1212,7 +1432,7 @@ def test():
     imageFile2.close()
 
     cp2 = ContourPlotter(bounds2.points)
-    left, right, _ = curve2.split(0.50)
+    left, right = curve2.splitAt([0.50])
     cp2.drawCurve(left.controlPoints, colorBlue)
     cp2.drawCurve(right.controlPoints, colorMagenta)
     cp2.drawHull(curve2, 0.5, colorLightGreen)
@@ -1229,7 +1449,7 @@ def test():
         steps = 100
         for v in range(1, steps + 1):
             t = Decimal(v) / steps
-            left, _, _ = curve.split(t)
+            left = curve.split(0, t)
             d = left.length
             pts.append((float(d), float(t)))
 
@@ -0,0 +1,291 @@
+"""\
+Benchmarks for the Bezier geometry code
+
+Usage: python BezierBenchmark.py [--ufo path] [--count n] [--seed n] [--time seconds]
+                                 [--only name,...] [--output file.json]
+                                 [--compare file.json] [--threshold percent]
+
+Each benchmark is run over a corpus of random synthetic curves and over the
+curves in the glyphs of a UFO font, by default the one in Samples/Sample.ufo.
+The results are printed as a table and can be written as JSON. Passing the
+JSON from an earlier run to --compare reports the change in speed for each
+benchmark, and exits with a status of 1 if any of them got slower by more
+than the threshold.
+
+Created on October 17, 2026
+
+@author Eric Mader
+"""
+
+import os
+import gc
+import json
+import time
+import random
+import logging
+import platform
+import tracemalloc
+from sys import argv, exit, stderr
+import numpy as np
+from TestArgumentIterator import TestArgs
+from Bezier import Bezier, BContour
+from SegmentPen import SegmentPen
+from UFOFont import UFOFont
+import CurveFitting
+
+class BezierBenchmarkArgs(TestArgs):
+    def __init__(self):
+        self.ufoFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Samples", "Sample.ufo")
+        self.count = 200
+        self.seed = 1
+        self.minTime = 0.5
+        self.only = None
+        self.outputFile = None
+        self.compareFile = None
+        self.threshold = 10.0
+        TestArgs.__init__(self)
+
+    @classmethod
+    def forArguments(cls, argumentList):
+        args = BezierBenchmarkArgs()
+        args.processArguments(argumentList)
+        return args
+
+    def processArgument(self, argument, arguments):
+        if argument == "--ufo":
+            self.ufoFile = arguments.nextExtra("UFO font")
+        elif argument == "--count":
+            self.count = arguments.nextExtraAsPosInt("count")
+        elif argument == "--seed":
+            self.seed = arguments.nextExtraAsPosInt("seed")
+        elif argument == "--time":
+            self.minTime = float(arguments.nextExtra("time"))
+        elif argument == "--only":
+            self.only = arguments.nextExtra("benchmark names").split(",")
+        elif argument == "--output":
+            self.outputFile = arguments.nextExtra("output file")
+        elif argument == "--compare":
+            self.compareFile = arguments.nextExtra("comparison file")
+        elif argument == "--threshold":
+            self.threshold = float(arguments.nextExtra("threshold"))
+        else:
+            TestArgs.processArgument(self, argument, arguments)
+
+    def completeInit(self):
+        if not os.path.isdir(self.ufoFile):
+            raise ValueError(f"Can't find the UFO font “{self.ufoFile}”.")
+
+class Corpus(object):
+    """\
+    The control points of a set of curves, and of a set of contours,
+    to run the benchmarks over. The benchmarks build new Bezier and
+    BContour objects from these for each round, so that the results
+    cached in those objects by one round aren't reused by the next.
+    """
+    def __init__(self, name, contours, seed):
+        self.name = name
+        self.contours = [contour for contour in contours if len(contour) > 0]
+        self.curves = [segment for contour in self.contours for segment in contour if len(segment) > 2]
+
+        # pairs of neighboring curves for the intersection benchmark
+        self.pairs = list(zip(self.curves[0::2], self.curves[1::2]))
+
+        # random query points inside the bounds of each contour
+        rng = random.Random(seed)
+        self.pointSets = []
+        for contour in self.contours:
+            xs = [x for segment in contour for x, _ in segment]
+            ys = [y for segment in contour for _, y in segment]
+            self.pointSets.append([(rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys))) for _ in range(64)])
+        self.points = [pointSet[0] for pointSet in self.pointSets]
+
+    @classmethod
+    def synthetic(cls, count, seed):
+        """\
+        Return a corpus of count random quadratic and cubic curves, chained
+        into contours of eight curves each.
+        """
+        rng = random.Random(seed)
+
+        def randomPoint(): return (rng.randint(0, 1000), rng.randint(0, 1000))
+
+        contours = []
+        contour = []
+        start = randomPoint()
+        for i in range(count):
+            segment = [start] + [randomPoint() for _ in range(2 + i % 2)]
+            contour.append(segment)
+            start = segment[-1]
+
+            if len(contour) == 8:
+                contours.append(contour)
+                contour = []
+
+        contours.append(contour)
+        return Corpus("synthetic", contours, seed)
+
+    @classmethod
+    def fromUFO(cls, ufoFile, seed):
+        """\
+        Return a corpus of the contours of all of the glyphs in the given UFO font.
+        """
+        font = UFOFont(ufoFile)
+        logger = logging.getLogger("bezier-benchmark")
+        contours = []
+        for glyphName in sorted(font.glyphSet.keys()):
+            pen = SegmentPen(font.glyphSet, logger)
+            font.glyphSet[glyphName].draw(pen)
+            contours.extend(pen.contours)
+
+        return Corpus("ufo", contours, seed)
+
+def curves(corpus):
+    return [Bezier(points) for points in corpus.curves]
+
+def curvesAndLines(corpus):
+    results = []
+    for points in corpus.curves:
+        ys = [y for _, y in points]
+        xs = [x for x, _ in points]
+        midY = (min(ys) + max(ys)) / 2
+        results.append((Bezier(points), [(min(xs) - 1, midY), (max(xs) + 1, midY)]))
+
+    return results
+
+def curvePairs(corpus):
+    return [(Bezier(p1), Bezier(p2)) for p1, p2 in corpus.pairs]
+
+def contoursAndPoints(corpus):
+    return [(BContour(contour), point) for contour, point in zip(corpus.contours, corpus.points)]
+
+def contoursAndPointSets(corpus):
+    return [(BContour(contour), points) for contour, points in zip(corpus.contours, corpus.pointSets)]
+
+def fitPoints(corpus):
+    return [[tuple(p) for p in Bezier(points).evaluate([0, 1 / 3, 2 / 3, 1]).tolist()] for points in corpus.curves]
+
+# name: (function to prepare the inputs for a round from a corpus, operation on one input)
+benchmarks = {
+    "init": (lambda corpus: corpus.curves, lambda points: Bezier(points)),
+    "get": (curves, lambda curve: curve.get(0.37)),
+    "getLUT": (curves, lambda curve: curve.getLUT(100)),
+    "length": (curves, lambda curve: curve.length),
+    "extrema": (curves, lambda curve: curve.extrema),
+    "bbox": (curves, lambda curve: curve.bbox),
+    "roots": (curvesAndLines, lambda cl: cl[0].roots(cl[1])),
+    "split": (curves, lambda curve: curve.split(0.5)),
+    "splitAt": (curves, lambda curve: curve.splitAt([0.5])),
+    "reduce": (curves, lambda curve: curve.reduce()),
+    "intersects": (curvePairs, lambda pair: pair[0].intersects(pair[1])),
+    "findClosestPoint": (contoursAndPoints, lambda cp: cp[0].findClosestPoint(cp[1], 20)),
+    "findClosestPoints": (contoursAndPointSets, lambda cp: cp[0].findClosestPoints(cp[1], 20)),
+    "fit": (fitPoints, lambda points: CurveFitting.fit(points)),
+    "fitBatch": (lambda corpus: [fitPoints(corpus)], lambda pointSets: CurveFitting.fitBatch(pointSets)),
+}
+
+def runBenchmark(prepare, operation, corpus, minTime):
+    """\
+    Run operation over the inputs prepared from corpus for at least minTime seconds,
+    and then once more while tracing memory allocations. Returns a dictionary of results.
+    """
+    times = []
+    count = 0
+    total = 0
+    while total < minTime and len(times) < 1000:
+        inputs = prepare(corpus)
+        count = len(inputs)
+        if count == 0: return None
+
+        start = time.perf_counter()
+        for input in inputs: operation(input)
+        elapsed = time.perf_counter() - start
+
+        times.append(elapsed)
+        total += elapsed
+
+    inputs = prepare(corpus)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for input in inputs: operation(input)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops": count,
+        "rounds": len(times),
+        "opsPerSecond": count / max(min(times), 1e-9),
+        "medianOpsPerSecond": count / max(sorted(times)[len(times) // 2], 1e-9),
+        "peakBytes": peak - before,
+        "retainedBytesPerOp": (after - before) / count
+    }
+
+def compare(results, baseline, threshold):
+    """\
+    Print the change in speed of each benchmark from the baseline.
+    Returns the names of the benchmarks that are slower by more than threshold percent.
+    """
+    regressions = []
+    print(f"\n{'benchmark':32} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None: continue
+
+        change = (result["opsPerSecond"] / base["opsPerSecond"] - 1) * 100
+        flag = ""
+        if change < -threshold:
+            flag = "  <-- slower"
+            regressions.append(name)
+        print(f"{name:32} {base['opsPerSecond']:14.1f} {result['opsPerSecond']:14.1f} {change:+7.1f}%{flag}")
+
+    return regressions
+
+def main():
+    argumentList = argv
+    programName = os.path.basename(argumentList.pop(0))
+
+    try:
+        args = BezierBenchmarkArgs.forArguments(argumentList)
+    except ValueError as error:
+        print(programName + ": " + str(error), file=stderr)
+        exit(1)
+
+    corpora = [Corpus.synthetic(args.count, args.seed), Corpus.fromUFO(args.ufoFile, args.seed)]
+
+    results = {}
+    print(f"{'benchmark':32} {'ops/sec':>14} {'peak KiB':>10} {'retained B/op':>14}")
+    for corpus in corpora:
+        for name, (prepare, operation) in benchmarks.items():
+            if args.only and name not in args.only: continue
+
+            result = runBenchmark(prepare, operation, corpus, args.minTime)
+            if result is None: continue
+
+            key = f"{corpus.name}/{name}"
+            results[key] = result
+            print(f"{key:32} {result['opsPerSecond']:14.1f} {result['peakBytes'] / 1024:10.1f} {result['retainedBytesPerOp']:14.1f}")
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "count": args.count,
+        "results": results
+    }
+
+    if args.outputFile:
+        with open(args.outputFile, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compareFile:
+        with open(args.compareFile) as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks are more than {args.threshold}% slower.")
+            exit(1)
+
+if __name__ == "__main__":
+    main()
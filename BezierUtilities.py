@@ -10,7 +10,12 @@ from https://github.com/Pomax/BezierInfo-2
 """
 
 import math
+import logging
 from decimal import Decimal
+import numpy as np
+import CurveFitting
+
+logger = logging.getLogger("bezier-utilities")
 
 # Legendre-Gauss abscissae with n=24 (x_i values, defined at i=n as the roots of the nth order Legendre polynomial Pn(x))
 tValues = [
@@ -68,6 +73,10 @@ cValues = [
     Decimal("0.0123412297999871995468056670700372915759"),
 ]
 
+# float versions of the tables above, for computing lengths with float arithmetic
+tValuesFloat = np.array([float(t) for t in tValues])
+cValuesFloat = np.array([float(c) for c in cValues])
+
 # float precision significant decimal
 epsilon = 0.000001
 
@@ -172,12 +181,239 @@ def droots(p):
     return []
 
 
+_powerBasisMatrices = {}
+
+def powerBasisMatrix(order):
+    """\
+    Return the matrix that converts the control points of a bézier curve
+    of the given order into power basis coefficients, so that
+    B(t) = [1, t, t², ..., t^order] · M · P
+
+    The matrices are computed once per order and cached, so they can't be modified.
+    """
+    matrix = _powerBasisMatrices.get(order)
+    if matrix is None:
+        matrix = np.array(CurveFitting.basisMatrix(order + 1), dtype=float)
+        matrix.flags.writeable = False
+        _powerBasisMatrices[order] = matrix
+
+    return matrix
+
+def powers(ts, order):
+    """\
+    Return an (N x order + 1) matrix whose rows are [1, t, t², ..., t^order]
+    for each of the N parameter values in ts.
+    """
+    return np.power.outer(np.asarray(ts, dtype=float), np.arange(order + 1))
+
+_lutPowers = {}
+
+def lutPowers(steps, order):
+    """\
+    Return powers(ts, order) for steps evenly spaced values of t from 0 to 1,
+    which is what a LUT with that many steps is evaluated at. The matrices are
+    computed once per steps and order and cached, so they must not be modified.
+    """
+    key = (steps, order)
+    matrix = _lutPowers.get(key)
+    if matrix is None:
+        matrix = powers(np.linspace(0, 1, steps), order)
+        matrix.flags.writeable = False
+        _lutPowers[key] = matrix
+
+    return matrix
+
+def roots(p):
+    """\
+    Return the values of t in [0, 1] where the bézier polynomial with the
+    coordinates p (e.g. the y coordinates of the control points of a
+    curve of order 1, 2 or 3) is zero.
+    """
+    def reduce(t):
+        return 0 <= t <= 1 or approximately(t, 0) or approximately(t, 1)
+
+    order = len(p) - 1
+    if order == 1:
+        a, b = p
+        return list(filter(reduce, [a / (a - b)])) if a != b else []
+
+    if order == 2:
+        a, b, c = p
+        d = a - 2 * b + c
+        if d != 0:
+            m1 = -sqrt(b * b - a * c)
+            m2 = -a + b
+            v1 = -(m1 + m2) / d
+            v2 = -(-m1 + m2) / d
+            return list(filter(reduce, [v1, v2]))
+        elif b != c and d == 0:
+            return list(filter(reduce, [(2 * b - c) / (2 * b - 2 * c)]))
+
+        return []
+
+    # see http://www.trans4mind.com/personal_development/mathematics/polynomials/cubicAlgebra.htm
+    pa, pb, pc, pd = p
+
+    d = -pa + 3 * pb - 3 * pc + pd
+    a = 3 * pa - 6 * pb + 3 * pc
+    b = -3 * pa + 3 * pb
+    c = pa
+
+    if approximately(d, 0):
+        # this is not a cubic curve.
+        if approximately(a, 0):
+            # in fact, this is not a quadratic curve either.
+            if approximately(b, 0):
+                # in fact, there are no solutions
+                return []
+
+            # linear solution:
+            return list(filter(reduce, [-c / b]))
+
+        # quadratic solution:
+        q = sqrt(b * b - 4 * a * c)
+        a2 = 2 * a
+        return list(filter(reduce, [(q - b) / a2, (-b - q) / a2]))
+
+    # at this point, we know we need a cubic solution:
+    a /= d
+    b /= d
+    c /= d
+
+    p = (3 * b - a * a) / 3
+    p3 = p / 3
+    q = (2 * a * a * a - 9 * a * b + 27 * c) / 27
+    q2 = q / 2
+    discriminant = q2 * q2 + p3 * p3 * p3
+
+    if discriminant < 0:
+        mp3 = -p / 3
+        mp33 = mp3 * mp3 * mp3
+        r = sqrt(mp33)
+        t = -q / (2 * r)
+        # cosphi = t < -1 ? -1: t > 1 ? 1: t
+        cosphi = -1 if t < -1 else 1 if t > 1 else t
+        phi = math.acos(cosphi)
+        crtr = crt(r)
+        t1 = 2 * crtr
+        x1 = t1 * math.cos(phi / 3) - a / 3
+        x2 = t1 * math.cos((phi + tau) / 3) - a / 3
+        x3 = t1 * math.cos((phi + 2 * tau) / 3) - a / 3
+        return list(filter(reduce, [x1, x2, x3]))
+    elif approximately(discriminant, 0):  # discriminant == 0:
+        u1 = crt(-q2) if q2 < 0 else -crt(q2)
+        x1 = 2 * u1 - a / 3
+        x2 = -u1 - a / 3
+        return list(filter(reduce, [x1, x2]))
+    else:
+        sd = sqrt(discriminant)
+        u1 = crt(-q2 + sd)
+        v1 = crt(q2 + sd)
+        return list(filter(reduce, [u1 - v1 - a / 3]))
+
 def lerp(r, v1, v2):
     """"Linear intrpolation between v1, v2"""
     v1x, v1y = v1
     v2x, v2y = v2
     return (v1x + r * (v2x - v1x), v1y + r * (v2y - v1y))
 
+# for each order, the binomial coefficients C(i, j) for i = 0 .. order
+_splitMatrices = {}
+
+def splitMatrix(order):
+    """\
+    Return the split matrix for curves of the given order: row i holds the
+    binomial coefficients C(i, j), j = 0 .. i. Splitting a curve with control
+    points P at t gives the control points
+
+        left[i] = sum(C(i, j) * t^j * (1 - t)^(i - j) * P[j], j = 0 .. i)
+        right[i] = sum(C(n - i, j) * t^j * (1 - t)^(n - i - j) * P[i + j], j = 0 .. n - i)
+
+    which is the result of de Casteljau's algorithm, without building the hull.
+    The matrices are cached, so they're tuples, which can't be modified.
+    """
+    matrix = _splitMatrices.get(order)
+    if matrix is None:
+        matrix = tuple(tuple(math.comb(i, j) for j in range(i + 1)) for i in range(order + 1))
+        _splitMatrices[order] = matrix
+
+    return matrix
+
+def splitPoints(points, t):
+    """\
+    Split the curve with the given control points at t.
+    Returns a tuple of the control points of the left and right pieces.
+    """
+    order = len(points) - 1
+
+    # the split matrices for the common orders, written out in their
+    # factored (de Casteljau) form, which takes the fewest operations
+    if order == 3:
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+        ax = x0 + t * (x1 - x0)
+        ay = y0 + t * (y1 - y0)
+        bx = x1 + t * (x2 - x1)
+        by = y1 + t * (y2 - y1)
+        cx = x2 + t * (x3 - x2)
+        cy = y2 + t * (y3 - y2)
+        dx = ax + t * (bx - ax)
+        dy = ay + t * (by - ay)
+        ex = bx + t * (cx - bx)
+        ey = by + t * (cy - by)
+        mid = (dx + t * (ex - dx), dy + t * (ey - dy))
+        return [points[0], (ax, ay), (dx, dy), mid], [mid, (ex, ey), (cx, cy), points[3]]
+
+    if order == 2:
+        (x0, y0), (x1, y1), (x2, y2) = points
+        ax = x0 + t * (x1 - x0)
+        ay = y0 + t * (y1 - y0)
+        bx = x1 + t * (x2 - x1)
+        by = y1 + t * (y2 - y1)
+        mid = (ax + t * (bx - ax), ay + t * (by - ay))
+        return [points[0], (ax, ay), mid], [mid, (bx, by), points[2]]
+
+    if order == 1:
+        (x0, y0), (x1, y1) = points
+        mid = (x0 + t * (x1 - x0), y0 + t * (y1 - y0))
+        return [points[0], mid], [mid, points[1]]
+
+    matrix = splitMatrix(order)
+    mt = 1 - t
+
+    tp = [1]
+    mtp = [1]
+    for _ in range(order):
+        tp.append(tp[-1] * t)
+        mtp.append(mtp[-1] * mt)
+
+    left = []
+    right = []
+    for i in range(order + 1):
+        row = matrix[i]
+        lx = ly = 0
+        for j, c in enumerate(row):
+            w = c * tp[j] * mtp[i - j]
+            px, py = points[j]
+            lx += w * px
+            ly += w * py
+        left.append((lx, ly))
+
+        row = matrix[order - i]
+        rx = ry = 0
+        for j, c in enumerate(row):
+            w = c * tp[j] * mtp[order - i - j]
+            px, py = points[i + j]
+            rx += w * px
+            ry += w * py
+        right.append((rx, ry))
+
+    # the end points of the pieces are exact
+    left[0] = points[0]
+    right[-1] = points[-1]
+    right[0] = left[-1]
+
+    return left, right
+
 def quadraticRatio(t):
     t2 = 2 * t
     top = t2 * t - t2
@@ -217,30 +453,227 @@ def angle(o, v1, v2):
 
     return math.atan2(cross, dot)
 
-def pairiteration(c1, c2, intersectionThreshold=0.5):
-    c1b = c1.boundsRectangle
-    c2b = c2.boundsRectangle
-    r = 100000
+def hullBounds(points):
+    """\
+    Return the bounds of the control points as a tuple (minX, minY, maxX, maxY).
+    By the convex hull property, these enclose the curve.
+    """
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return (min(xs), min(ys), max(xs), max(ys))
 
-    if c1b.height + c1b.width < intersectionThreshold and c2b.height + c2b.width < intersectionThreshold:
-        return [(((r * (c1._t1 + c1._t2)) / 2) / r, ((r * (c2._t1 + c2._t2)) / 2) / r)]
+def boundsOverlap(b1, b2):
+    """\
+    Return True if the bounds tuples b1 and b2 overlap.
+    """
+    return b1[0] <= b2[2] and b2[0] <= b1[2] and b1[1] <= b2[3] and b2[1] <= b1[3]
 
-    cc1left, cc1right, _ = c1.split(0.5)
-    cc2left, cc2right, _ = c2.split(0.5)
-    pairs = [(cc1left, cc2left), (cc1left, cc2right), (cc1right, cc2right), (cc1right, cc2left)]
-    pairs = list(filter(lambda pair: pair[0].overlaps(pair[1]), pairs))
+def clipToFatLine(line, points):
+    """\
+    Clip the curve with the given control points to the "fat line" of the
+    curve with the control points in line: the band between the lines parallel
+    to the line from its start to its end that encloses all of its control points.
 
+    Returns the range (tMin, tMax) of the part of the curve that can be inside
+    the band, or None if the curve can't cross it. Returns (0, 1) if the fat
+    line is degenerate.
+    """
+    (sx, sy), (ex, ey) = line[0], line[-1]
+    dx = ex - sx
+    dy = ey - sy
+    length = math.hypot(dx, dy)
+    if length == 0: return (0, 1)
+
+    # the signed distance of a point from the line
+    def distance(p):
+        px, py = p
+        return (dx * (py - sy) - dy * (px - sx)) / length
+
+    lineDistances = [distance(p) for p in line]
+    dMin = min(0, min(lineDistances)) - epsilon
+    dMax = max(0, max(lineDistances)) + epsilon
+
+    # the distances of the control points of the curve from the line are
+    # the control points of an explicit curve (t, d(t)). Its convex hull is
+    # inside the convex hull of the pairs of points, so clip all of the pairs.
+    n = len(points) - 1
+    hull = [(i / n, distance(p)) for i, p in enumerate(points)]
+    tMin = 2
+    tMax = -1
+
+    for t, d in hull:
+        if dMin <= d <= dMax:
+            tMin = min(tMin, t)
+            tMax = max(tMax, t)
+
+    for i in range(n + 1):
+        ti, di = hull[i]
+        for j in range(i + 1, n + 1):
+            tj, dj = hull[j]
+            if di == dj: continue
+            for bound in (dMin, dMax):
+                if min(di, dj) <= bound <= max(di, dj):
+                    t = ti + (tj - ti) * (bound - di) / (dj - di)
+                    tMin = min(tMin, t)
+                    tMax = max(tMax, t)
+
+    if tMin > tMax: return None
+
+    return (max(0, tMin), min(1, tMax))
+
+def removeNearDuplicates(results, tolerance):
+    """\
+    Given a list of (value, point) tuples, return a list of the values, leaving
+    out any value whose point is within tolerance of the point of a value that was
+    already kept. This takes O(n log n) time, rather than the O(n²) of removeDuplicates().
+    """
+    # The kept points are stored in a grid of cells tolerance on a side,
+    # so a point only has to be checked against the cells around its own.
+    # Two points in the same cell are within tolerance of each other, so
+    # each cell holds at most one kept point, even when many share an x.
+    size = tolerance if tolerance > 0 else 1.0
+    kept = []
+    cells = {}
+    for value, point in sorted(results, key=lambda r: r[1][0]):
+        px, py = point
+        cx, cy = math.floor(px / size), math.floor(py / size)
+        duplicate = any(abs(px - kx) <= tolerance and abs(py - ky) <= tolerance
+                        for nx in (cx - 1, cx, cx + 1) for ny in (cy - 1, cy, cy + 1)
+                        for kx, ky in cells.get((nx, ny), ()))
+
+        if not duplicate:
+            kept.append(value)
+            cells.setdefault((cx, cy), []).append(point)
+
+    return sorted(kept)
+
+def pairiteration(c1, c2, intersectionThreshold=0.5, maxIterations=4096, maxDepth=64, unresolved=None):
+    """\
+    Find the intersections of the curves c1 and c2 using Bézier clipping.
+    Returns a list of (t1, t2) tuples, mapped into the _t1 .. _t2 ranges of the curves.
+
+    Each step clips one curve to the fat line of the other. If that doesn't shrink
+    the curve by at least 20%, which happens when there's more than one intersection,
+    or the curves are close to tangent, the longer curve is split in half instead.
+    The work is kept on an explicit stack, and is limited to maxIterations steps and
+    a depth of maxDepth clips and splits, so nearly tangent or overlapping curves
+    can't cause runaway subdivision.
+
+    Only pieces that both get smaller than intersectionThreshold are intersections.
+    Pieces that reach maxDepth without doing that, and pieces still on the stack
+    when maxIterations runs out, haven't converged. They aren't in the result; a
+    warning is logged, and if unresolved is a list, ((start1, end1), (start2, end2))
+    tuples of the t ranges of each of them are appended to it.
+    """
+    # stack entries: (points1, start1, end1, points2, start2, end2, depth, clip the first curve?)
+    stack = [(c1.controlPoints, 0, 1, c2.controlPoints, 0, 1, 0, False)]
     results = []
-    if len(pairs) == 0: return results
-
-    for pair in pairs:
-        left, right = pair
-        results.extend(pairiteration(left, right, intersectionThreshold))
-
-    return removeDuplicates(results)
+    unconverged = []
+    iterations = 0
+
+    def tRanges(s1, e1, s2, e2):
+        return ((map(s1, 0, 1, c1._t1, c1._t2), map(e1, 0, 1, c1._t1, c1._t2)),
+                (map(s2, 0, 1, c2._t1, c2._t2), map(e2, 0, 1, c2._t1, c2._t2)))
+
+    while stack and iterations < maxIterations:
+        iterations += 1
+        p1, s1, e1, p2, s2, e2, depth, clipFirst = stack.pop()
+        b1 = hullBounds(p1)
+        b2 = hullBounds(p2)
+        if not boundsOverlap(b1, b2): continue
+
+        size1 = b1[2] - b1[0] + b1[3] - b1[1]
+        size2 = b2[2] - b2[0] + b2[3] - b2[1]
+        if size1 < intersectionThreshold and size2 < intersectionThreshold:
+            t1 = map((s1 + e1) / 2, 0, 1, c1._t1, c1._t2)
+            t2 = map((s2 + e2) / 2, 0, 1, c2._t1, c2._t2)
+            point = ((b1[0] + b1[2]) / 2, (b1[1] + b1[3]) / 2)
+            results.append(((t1, t2), point))
+            continue
+
+        if depth >= maxDepth:
+            unconverged.append(tRanges(s1, e1, s2, e2))
+            continue
+
+        if clipFirst:
+            clip = clipToFatLine(p2, p1)
+        else:
+            clip = clipToFatLine(p1, p2)
+
+        if clip is None: continue
+
+        tMin, tMax = clip
+        if tMax - tMin > 0.8:
+            # not enough progress: split the bigger curve
+            if size1 >= size2:
+                left, right = splitPoints(p1, 0.5)
+                m1 = (s1 + e1) / 2
+                stack.append((left, s1, m1, p2, s2, e2, depth + 1, clipFirst))
+                stack.append((right, m1, e1, p2, s2, e2, depth + 1, clipFirst))
+            else:
+                left, right = splitPoints(p2, 0.5)
+                m2 = (s2 + e2) / 2
+                stack.append((p1, s1, e1, left, s2, m2, depth + 1, clipFirst))
+                stack.append((p1, s1, e1, right, m2, e2, depth + 1, clipFirst))
+            continue
+
+        # keep the part of the clipped curve in [tMin, tMax],
+        # and clip the other curve against it next time
+        if clipFirst:
+            p1 = clipPoints(p1, tMin, tMax)
+            s1, e1 = s1 + (e1 - s1) * tMin, s1 + (e1 - s1) * tMax
+        else:
+            p2 = clipPoints(p2, tMin, tMax)
+            s2, e2 = s2 + (e2 - s2) * tMin, s2 + (e2 - s2) * tMax
+
+        stack.append((p1, s1, e1, p2, s2, e2, depth + 1, not clipFirst))
+
+    # anything left on the stack ran out of iterations
+    unconverged.extend(tRanges(s1, e1, s2, e2) for _, s1, e1, _, s2, e2, _, _ in stack)
+
+    if unconverged:
+        logger.warning(f"{len(unconverged)} pieces of the curves didn't converge to an intersection "
+                       f"within {maxDepth} levels and {maxIterations} iterations.")
+        if unresolved is not None: unresolved.extend(unconverged)
+
+    return removeNearDuplicates(results, intersectionThreshold)
+
+def clipPoints(points, t1, t2):
+    """\
+    Return the control points of the part of the curve from t1 to t2.
+    """
+    if t2 < 1: points, _ = splitPoints(points, t2)
+    if t1 > 0: _, points = splitPoints(points, t1 / t2)
+    return points
+
+def testPairIteration():
+    from Bezier import Bezier
+
+    # a parabola that dips 0.0001 below the line at its lowest point,
+    # so the two intersections are very close together and nearly tangent
+    line = Bezier([(-100, 0), (100, 0)])
+    curve = Bezier([(-100, 100 - 0.0001), (0, -100 - 0.0001), (100, 100 - 0.0001)])
+
+    unresolved = []
+    intersections = pairiteration(curve, line, unresolved=unresolved)
+    assert len(intersections) == 1 and approximately(intersections[0][0], 0.5, 0.01), f"intersections = {intersections}"
+    assert unresolved == [], f"unresolved = {unresolved}"
+
+    # with the depth limited, the pieces near the tangent point don't get under the
+    # threshold; they must be reported as unresolved, not as intersections
+    unresolved = []
+    intersections = pairiteration(curve, line, maxDepth=8, unresolved=unresolved)
+    assert intersections == [], f"intersections at the depth limit = {intersections}"
+    assert len(unresolved) > 0, "no unresolved pieces at the depth limit"
+    assert all(abs((start + end) / 2 - 0.5) < 0.1 for (start, end), _ in unresolved), f"unresolved = {unresolved}"
+
+    # the pieces left on the stack when the iterations run out are unresolved too
+    unresolved = []
+    intersections = pairiteration(curve, line, maxIterations=3, unresolved=unresolved)
+    assert intersections == [] and len(unresolved) > 0, f"intersections = {intersections}, unresolved = {unresolved}"
 
 def test():
-    print("No tests...")
+    testPairIteration()
 
 if __name__ == "__main__":
     test()
@@ -10,6 +10,7 @@ from https://github.com/Pomax/BezierInfo-2
 """
 
 import math
+import numpy as np
 from MatrixInversion import matrixInvert
 
 binomialCoefficients = [
@@ -175,14 +176,184 @@ def bestFit(P, M, S, n=None):
 
     return (Cx, Cy)
 
-def fit(points, polygonal=True):
+_basisMatrices = {}
+
+def basisMatrixArrays(n):
+    """\
+    Return the (n x n) basis matrix and its inverse as NumPy arrays.
+    The matrices are computed once for each n and cached, so they can't be modified.
+    """
+    matrices = _basisMatrices.get(n)
+    if matrices is None:
+        m = np.array(basisMatrix(n), dtype=float)
+
+        # the basis matrix is lower triangular with a non-zero diagonal,
+        # so solving against the identity is exact and always succeeds
+        matrices = (m, np.linalg.solve(m, np.eye(n)))
+        for matrix in matrices: matrix.flags.writeable = False
+        _basisMatrices[n] = matrices
+
+    return matrices
+
+def computeTimeValuesArray(points, polygonal=True):
+    """\
+    Return an (B x N) array of the time values for each of the
+    B point sets in the (B x N x 2) array points.
+    """
+    b, n, _ = points.shape
+    if not polygonal or n < 2:
+        return np.broadcast_to(np.linspace(0, 1, n), (b, n))
+
+    d = np.zeros((b, n))
+    np.cumsum(np.hypot(*np.diff(points, axis=1).transpose(2, 0, 1)), axis=1, out=d[:, 1:])
+    return d / d[:, -1:]
+
+def bestFitBatch(P, S, n=None):
+    """\
+    Fit B curves with n control points to the (B x N x 2) array of points P,
+    at the (B x N) array of time values S. Returns a (B x n x 2) array of control points.
+
+    Instead of inverting TᵀT, this solves T · (M · C) = P with a QR decomposition
+    of T, which doesn't lose precision when T is badly conditioned.
+    """
+    if not n: n = P.shape[1]
+
+    _, M1 = basisMatrixArrays(n)
+    T = np.power.outer(S, np.arange(n))
+    Q, R = np.linalg.qr(T)
+    MC = np.linalg.solve(R, np.swapaxes(Q, 1, 2) @ P)
+
+    return M1 @ MC
+
+def fitBatch(pointSets, polygonal=True):
+    """\
+    Fit a curve to each of a list of point sets, all of which have
+    the same number of points, N. Returns a (B x N x 2) array of the
+    control points of the curves.
+    """
+    P = np.asarray(pointSets, dtype=float)
+    if P.ndim != 3 or P.shape[2] != 2:
+        raise ValueError("All of the point sets must have the same number of (x, y) points.")
+
+    S = computeTimeValuesArray(P, polygonal=polygonal)
+    return bestFitBatch(P, S)
+
+backends = ["python", "numpy"]
+defaultBackend = "numpy"
+
+def fit(points, polygonal=True, backend=None):
+    """\
+    Fit a curve to points. Returns (points, basis matrix, time values, (Cx, Cy)),
+    where Cx and Cy are column vectors of the x and y coordinates of the control points.
+
+    backend is the name of the method used to compute the fit: "python", which uses
+    the original pure Python matrix code, or "numpy". The default is defaultBackend.
+    """
+    backend = backend or defaultBackend
+    if backend not in backends:
+        raise ValueError(f"Unknown curve fitting backend “{backend}”.")
+
     n = len(points)
-    m = basisMatrix(n)
     s = computeTimeValues(points, polygonal=polygonal)
-    c = bestFit(points, m, s)
+
+    if backend == "python":
+        m = basisMatrix(n)
+        c = bestFit(points, m, s)
+    else:
+        m = basisMatrixArrays(n)[0].tolist()
+        P = np.asarray(points, dtype=float)[np.newaxis]
+        C = bestFitBatch(P, np.asarray(s, dtype=float)[np.newaxis])[0]
+        c = ([[v] for v in C[:, 0].tolist()], [[v] for v in C[:, 1].tolist()])
 
     return (points, m, s, c)
 
+def _lineAsCubic(p0, p3):
+    p0 = np.asarray(p0, dtype=float)
+    d = (np.asarray(p3, dtype=float) - p0) / 3
+    return np.array([p0, p0 + d, p0 + 2 * d, p3])
+
+def _fitCubic(P):
+    """\
+    Return the (4 x 2) control points of the cubic curve that starts at P[0], ends at P[-1]
+    and is the least squares fit to the points in between, and the index of the point
+    that is farthest from the curve, and its distance.
+    """
+    n = len(P)
+    p0, p3 = P[0], P[-1]
+    if n == 2: return _lineAsCubic(p0, p3), 0, 0.0
+
+    s = np.asarray(computeTimeValues(P), dtype=float)
+    ms = 1 - s
+
+    if n == 3:
+        # the quadratic through the three points, raised to a cubic
+        t = s[1]
+        q1 = (P[1] - ms[1] * ms[1] * p0 - t * t * p3) / (2 * t * ms[1])
+        curve = np.array([p0, p0 + 2 / 3 * (q1 - p0), p3 + 2 / 3 * (q1 - p3), p3])
+        return curve, 1, 0.0
+
+    b0, b1, b2, b3 = ms ** 3, 3 * ms * ms * s, 3 * ms * s * s, s ** 3
+    A = np.stack([b1, b2], axis=1)
+    R = P - np.outer(b0, p0) - np.outer(b3, p3)
+
+    # the ends are fixed, so there are only two unknown control points
+    (c1, c2), _, rank, _ = np.linalg.lstsq(A, R, rcond=None)
+
+    # if the time values are too close to the ends to solve for them,
+    # use the line between the ends, and measure it like any other fit
+    curve = _lineAsCubic(p0, p3) if rank < 2 else np.array([p0, c1, c2, p3])
+    errors = np.hypot(*(np.stack([b0, b1, b2, b3], axis=1) @ curve - P).T)
+    worst = int(np.argmax(errors[1:-1])) + 1
+    return curve, worst, errors[worst]
+
+def _fitPiecewise(P, maxError):
+    # fit the points, splitting at the worst point until each piece is close enough.
+    # The stack holds the pieces still to be fit, with the leftmost on top.
+    pieces = [(0, len(P))]
+    while pieces:
+        start, end = pieces.pop()
+        curve, worst, error = _fitCubic(P[start:end])
+        if error <= maxError or end - start <= 3:
+            yield [tuple(p) for p in curve.tolist()]
+        else:
+            split = start + worst
+            pieces.append((split, end))
+            pieces.append((start, split + 1))
+
+def fitPiecewise(points, maxError=0.5, chunkSize=256):
+    """\
+    Fit a chain of cubic curves to a sequence of points, such that no point is
+    more than maxError from its curve at the point's time value. Yields the control
+    points of each curve as a list of four (x, y) tuples. Each curve starts where
+    the previous one ends.
+
+    points can be any iterable, such as a generator. They're read chunkSize points
+    at a time, and the curves for a chunk are yielded before the next chunk is read,
+    so the work for each fit is bounded by chunkSize. A curve always ends at the last
+    point of a chunk.
+
+    Each curve starts and ends on a point, with interior control points that are the
+    least squares fit to the points in between. When a curve doesn't fit well enough,
+    the points are split at the one that's farthest from the curve, and each half is fit
+    separately. Runs of fewer than four points are fit exactly.
+    """
+    if chunkSize < 2: raise ValueError("The chunk size must be at least 2.")
+
+    chunk = []
+    for point in points:
+        point = tuple(point)
+
+        # repeated points would give two points the same time value
+        if chunk and point == chunk[-1]: continue
+
+        chunk.append(point)
+        if len(chunk) == chunkSize:
+            yield from _fitPiecewise(np.array(chunk, dtype=float), maxError)
+            chunk = [chunk[-1]]
+
+    if len(chunk) > 1:
+        yield from _fitPiecewise(np.array(chunk, dtype=float), maxError)
+
 def test():
     m = [[-1, 0, 0], [0, -1, 0], [0, 0, 1]]
     pr = [[100, 200, 1]]
@@ -193,9 +364,19 @@ def test():
     m = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]]
     print(transpose(m))
 
-    # points = [(70, 120), (80, 160), (110, 170), (120, 120)]
-    #
-    # f = fit(points)
+    points = [(70, 120), (80, 160), (110, 170), (120, 120)]
+    for backend in backends:
+        _, _, _, (cx, cy) = fit(points, backend=backend)
+        print(f"{backend}: {[(x[0], y[0]) for x, y in zip(cx, cy)]}")
+    print(f"batch: {fitBatch([points, points[::-1]]).tolist()}")
+
+    circle = ((100 * math.cos(a / 50), 100 * math.sin(a / 50)) for a in range(315))
+    print(f"piecewise: {list(fitPiecewise(circle, maxError=0.1))}")
+
+    # the time values of the middle points are so small that the
+    # fit for the interior control points is degenerate
+    print(f"degenerate: {list(fitPiecewise([(0, 0), (1e-200, 0), (2e-200, 0), (1, 0)], 0.5))}")
+    print(f"degenerate bend: {list(fitPiecewise([(0, 0), (1e-200, 0), (2e-200, 1e-200), (1, 5)], 0.5))}")
 
 if __name__ == "__main__":
     test()
@@ -1,4 +1,4 @@
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 
 def pi():
     """Compute Pi to the current precision.
@@ -7,30 +7,30 @@ def pi():
     3.141592653589793238462643383
 
     """
-    getcontext().prec += 2  # extra digits for intermediate steps
-    three = Decimal(3)      # substitute "three=3.0" for regular floats
-    lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
-    while s != lasts:
-        lasts = s
-        n, na = n+na, na+8
-        d, da = d+da, da+32
-        t = (t * n) / d
-        s += t
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2       # extra digits for intermediate steps
+        three = Decimal(3)      # substitute "three=3.0" for regular floats
+        lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n+na, na+8
+            d, da = d+da, da+32
+            t = (t * n) / d
+            s += t
     return +s               # unary plus applies the new precision
 
 _pi = pi()
 
 def radians(degrees):
-    getcontext().prec += 2
-    rad = _pi * degrees / 180
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        rad = _pi * degrees / 180
     return +rad
 
 def degrees(radians):
-    getcontext().prec += 2
-    deg = radians * 180 / _pi
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        deg = radians * 180 / _pi
     return +deg
 
 def exp(x):
@@ -46,15 +46,15 @@ def exp(x):
     (7.38905609893+0j)
 
     """
-    getcontext().prec += 2
-    i, lasts, s, fact, num = 0, 0, 1, 1, 1
-    while s != lasts:
-        lasts = s
-        i += 1
-        fact *= i
-        num *= x
-        s += num / fact
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        i, lasts, s, fact, num = 0, 0, 1, 1, 1
+        while s != lasts:
+            lasts = s
+            i += 1
+            fact *= i
+            num *= x
+            s += num / fact
     return +s
 
 def cos(x):
@@ -71,18 +71,18 @@ def cos(x):
     (0.87758256189+0j)
 
     """
-    getcontext().prec += 2
-    i, lasts, s, fact, num, sign = 0, 0, 1, 1, 1, 1
-    c = 0
-    while s != lasts:
-        lasts = s
-        i += 2
-        fact *= i * (i-1)
-        num *= x * x
-        sign *= -1
-        s += num / fact * sign
-        c += 1
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        i, lasts, s, fact, num, sign = 0, 0, 1, 1, 1, 1
+        c = 0
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i-1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+            c += 1
     return +s
 
 def sin(x):
@@ -99,18 +99,18 @@ def sin(x):
     (0.479425538604+0j)
 
     """
-    getcontext().prec += 2
-    i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
-    c = 0
-    while s != lasts:
-        lasts = s
-        i += 2
-        fact *= i * (i-1)
-        num *= x * x
-        sign *= -1
-        s += num / fact * sign
-        c += 1
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
+        c = 0
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i-1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+            c += 1
     return +s
 
 def tan(x):
@@ -132,23 +132,23 @@ def atan(x):
     atan(x) = x - x**3/3 + x**5/5 - x**7/7 + ...
     Compare with the series for sine, which is similar but has factorials in the denominator.
     """
-    getcontext().prec += 2
-    i, lasts, s, num, sign = 1, 0, x, x, 1
-
-    for _ in range(2000000):
-        lasts = s
-        i += 2
-        num *= x * x
-        sign *= -1
-        s += (num / i) * sign
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        i, lasts, s, num, sign = 1, 0, x, x, 1
+
+        for _ in range(2000000):
+            lasts = s
+            i += 2
+            num *= x * x
+            sign *= -1
+            s += (num / i) * sign
     return +s
 
 def atan2(y, x):
-    getcontext().prec += 2
-    slope = x / y
-    angle = atan(slope)
-    getcontext().prec -= 2
+    with localcontext() as context:
+        context.prec += 2
+        slope = x / y
+        angle = atan(slope)
     return +angle
 
 def test():
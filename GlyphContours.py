@@ -17,16 +17,25 @@ class GTGlyphCoutours(object):
 
     logger = logging.getLogger("glyph-contours")
 
-    def __init__(self, glyph):
+    def __init__(self, glyph, contours=None):
+        """\
+        Classify the segments of the glyph's contours. If contours is given,
+        such as from an OutlineCache, it's used instead of drawing the glyph.
+        """
         self._glyph = glyph
-        font = glyph._font
-        pen = SegmentPen(font.glyphSet, self.logger)
-        font.glyphSet[glyph.name()].draw(pen)
-        self._contours = pen.contours
+        if contours is None:
+            font = glyph._font
+            pen = SegmentPen(font.glyphSet, self.logger)
+            font.glyphSet[glyph.name()].draw(pen)
+            contours = pen.contours
+
+        self._contours = contours
 
         # make a pass over the contours to calculate the bounds
+        # and sort the lines into buckets by their direction
         minX = minY = 65536
         maxX = maxY = -65536
+        buckets = {bucket: [] for bucket in self._bucketNames}
         for contour in self._contours:
             for segment in contour:
                 for x, y in segment:
@@ -35,7 +44,39 @@ class GTGlyphCoutours(object):
                     maxX = max(maxX, x)
                     maxY = max(maxY, y)
 
+                if len(segment) == 2:
+                    buckets["lines"].append(segment)
+
+                    # a zero length line is both vertical and horizontal
+                    vertical = PathUtilities.isVerticalLine(segment)
+                    horizontal = PathUtilities.isHorizontalLine(segment)
+                    if vertical: buckets["vertical"].append(segment)
+                    if horizontal: buckets["horizontal"].append(segment)
+                    if not (vertical or horizontal): buckets["diagonal"].append(segment)
+
         self._boundsRectangle = PathUtilities.GTBoundsRectangle((minX, minY), (maxX, maxY))
+        self._buckets = buckets
+        self._indices = {}
+
+    _bucketNames = ["lines", "vertical", "horizontal", "diagonal"]
+
+    def _crossing(self, bucket, sortAxis, crossAxis, value):
+        # Return the segments in the bucket that cross value on crossAxis,
+        # sorted by the start point's coordinate on sortAxis. The sorted
+        # segments are indexed by their extent on crossAxis the first time.
+        key = (bucket, sortAxis, crossAxis)
+        index = self._indices.get(key)
+        if index is None:
+            segments = sorted(self._buckets[bucket], key=lambda s: s[0][sortAxis])
+            bounds = PathUtilities.GTBoundsArray.fromSegments(segments)
+            if crossAxis == 0:
+                lows, highs = bounds.left, bounds.right
+            else:
+                lows, highs = bounds.bottom, bounds.top
+            index = PathUtilities.GTIntervalIndex(segments, list(zip(lows.tolist(), highs.tolist())))
+            self._indices[key] = index
+
+        return index.itemsContaining(value)
 
     @property
     def contours(self):
@@ -49,84 +90,60 @@ class GTGlyphCoutours(object):
         """\
         Return a list of all the vertical lines in the contours.
         """
-        v = []
-        for contour in self._contours:
-            for segment in contour:
-                if PathUtilities.isVerticalLine(segment):
-                    v.append(segment)
-
-        return v
+        return list(self._buckets["vertical"])
 
     def verticalLinesCrossing(self, y):
         """\
         Return a list of all the vertical lines in the contours that
         span the given y coordinate.
         """
-        return list(filter(lambda s: self.crossesY(s, y), self.sortByX(self.verticalLines())))
+        return self._crossing("vertical", 0, 1, y)
 
     def horizontalLines(self):
         """\
         Return a list of all the horizontal lines in the contours.
         """
-        h = []
-        for contour in self._contours:
-            for segment in contour:
-                if PathUtilities.isHorizontalLine(segment):
-                    h.append(segment)
-
-        return h
+        return list(self._buckets["horizontal"])
 
     def horizontalLinesCrossing(self, x):
         """\
         Return a list of all the horizontal lines in the contours that
         span the given x coordinate.
         """
-        return list(filter(lambda s: self.crossesX(s, x), self.sortByY((self.horizontalLines()))))
+        return self._crossing("horizontal", 1, 0, x)
 
     def diagonalLines(self):
         """\
         Return a list of all the horizontal lines in the contours.
         """
-        d = []
-        for contour in self._contours:
-            for segment in contour:
-                if PathUtilities.isDiagonalLine(segment):
-                    d.append(segment)
-
-        return d
+        return list(self._buckets["diagonal"])
 
     def diagonalLinesCrossingX(self, x):
         """\
         Return a list of all the diagonal lines in the contours that
         span the given x coordinate.
         """
-        return list(filter(lambda s: self.crossesX(s, x), self.sortByY((self.diagonalLines()))))
+        return self._crossing("diagonal", 1, 0, x)
 
     def diagonalLinesCrossingY(self, y):
         """\
         Return a list of all the vertical lines in the contours that
         span the given y coordinate.
         """
-        return list(filter(lambda s: self.crossesY(s, y), self.sortByY((self.diagonalLines()))))
+        return self._crossing("diagonal", 1, 1, y)
 
     def lines(self):
         """\
         Return a list of all the lines in the contours.
         """
-        l = []
-        for contour in self._contours:
-            for segment in contour:
-                if len(segment) == 2:
-                    l.append(segment)
-
-        return l
+        return list(self._buckets["lines"])
 
     def linesCrossingY(self, y):
         """\
         Return a list of all the lines in the contours that
         cross a given y coordinate.
         """
-        return list(filter(lambda s: self.crossesY(s, y), self.sortByX(self.lines())))
+        return self._crossing("lines", 0, 1, y)
 
     @classmethod
     def sortByX(cls, contour):
@@ -154,14 +171,14 @@ class GTGlyphCoutours(object):
         """\
         Test if the line crosses the given y coordinate.
         """
-        return PathUtilities.GTBoundsRectangle(*line).crossesY(y)
+        return min(p[1] for p in line) <= y <= max(p[1] for p in line)
 
     @classmethod
     def crossesX(cls, line, x):
         """\
         Test if the line crosses the given x coordinate.
         """
-        return PathUtilities.GTBoundsRectangle(*line).crossesX(x)
+        return min(p[0] for p in line) <= x <= max(p[0] for p in line)
 
     def verticalStrokeWidth(self, atHeight):
         """\
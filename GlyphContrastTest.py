@@ -18,6 +18,7 @@ from FontDocTools.ArgumentIterator import ArgumentIterator
 from GlyphTest import GTFont
 from Bezier import Bezier, BOutline, drawOutline
 from SegmentPen import SegmentPen
+from OutlineCache import OutlineCache
 from UFOFont import UFOFont
 import PathUtilities
 import ContourPlotter
@@ -55,7 +56,7 @@ def main():
     if args.fontFile.endswith(".ufo"):
         font = UFOFont(args.fontFile)
     else:
-        font = GTFont(args.fontFile, fontName=args.fontName)
+        font = GTFont(args.fontFile, fontName=args.fontName, lazy=True)
 
     fullName = font.fullName
     if fullName.startswith("."): fullName = fullName[1:]
@@ -66,9 +67,19 @@ def main():
 
     glyph = args.getGlyph(font)
     glyphName = glyph.name()
-    pen = SegmentPen(font.glyphSet, logger)
-    font.glyphSet[glyph.name()].draw(pen)
-    contours = pen.contours
+    def drawContours():
+        pen = SegmentPen(font.glyphSet, logger)
+        font.glyphSet[glyphName].draw(pen)
+        return pen.contours
+
+    if args.cacheDir:
+        cache = OutlineCache(args.cacheDir)
+        contours = cache.getContours(cache.keyFor(args.fontFile, font.faceNumber, glyphName), drawContours)
+    else:
+        contours = drawContours()
+
+    # everything after this works on the contours
+    font.close()
     outline = BOutline(contours)
     bounds = outline.boundsRectangle
     closePoints = []
@@ -91,9 +102,9 @@ def main():
     outerContour, innerContour = outline.bContours[:2]  # slice in case there's more than two contours...
     outerLUT = outerContour.getLUT(steps)
 
-    for op in outerLUT:
-        closest, ip = innerContour.findClosestPoint(op, steps)
-        closePoints.append((closest, op, ip))
+    distances, innerPoints = innerContour.findClosestPoints(outerLUT, steps)
+    for closest, op, ip in zip(distances.tolist(), outerLUT, innerPoints.tolist()):
+        closePoints.append((closest, op, tuple(ip)))
 
     closePoints.sort(key=lambda cp: cp[0])
 
@@ -6,17 +6,21 @@ Created on June 18, 2020
 @author Eric Mader
 """
 
+import mmap
+from collections import OrderedDict
 from os.path import basename
 from sys import argv, exit, stderr
 from logging import getLogger, ERROR
 from re import fullmatch
-from fontTools.ttLib import ttFont, TTLibError
+from fontTools.ttLib import ttFont, TTLibError, TTCollection
 from fontTools.pens import svgPathPen
 from FontDocTools.ArgumentIterator import ArgumentIterator
 from FontDocTools.Font import Font, Glyph
 import ContourPlotter
 import PathUtilities
 import GlyphContours
+from OutlineCache import OutlineCache
+from SegmentPen import SegmentPen
 
 class GlyphTestArgumentIterator(ArgumentIterator):
     def __init__(self, arguments):
@@ -61,6 +65,7 @@ class GlyphTestArgs:
         self.project = None
         self.pinwheel = None
         self.ccw = True
+        self.cacheDir = None
 
     def completeInit(self):
         """\
@@ -168,6 +173,8 @@ class GlyphTestArgs:
                     args.charCode = cls.getHexCharCode(extra[1:])
                 elif extra[0:3] == "gid":
                     args.glyphID = cls.getGlyphID(extra[3:])
+            elif argument == "--cache":
+                args.cacheDir = arguments.nextExtra("cache directory")
             else:
                 raise ValueError(f"Unrecognized option “{argument}”.")
 
@@ -175,8 +182,94 @@ class GlyphTestArgs:
         return args
 
 class GTFont(Font):
-    def __init__(self, fontFile, fontName=None, fontNumber=None):
-        Font.__init__(self, fontFile, fontName, fontNumber)
+    # the maximum number of Glyph objects to keep
+    glyphCacheSize = 256
+
+    def __init__(self, fontFile, fontName=None, fontNumber=None, lazy=False):
+        """\
+        Open the given font. If lazy is True, the font file is memory mapped
+        instead of read, and each table is only read and decoded when it is first
+        used, as is each glyph in the glyf table. The glyph set is also made on
+        first use. This keeps only the parts of a large font that are used in memory.
+
+        The font's file stays open until close() is called, or the with
+        statement that the font is used in ends.
+        """
+        self._mmap = None
+
+        if lazy:
+            with open(fontFile, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if fontNumber is None:
+                fontNumber = self._faceNumberForName(self._mmap, fontName) if fontName else 0
+
+            # Font.__init__ would read the whole file, so instead
+            # we set up the state that it would have made ourselves
+            self._ttFont = ttFont.TTFont(self._mmap, fontNumber=fontNumber, lazy=True)
+            self._ttGlyphSet = None
+            self._glyphs = {}
+            self._hMetrics = None
+            self._vMetrics = None
+        else:
+            if fontNumber is None:
+                with open(fontFile, "rb") as file:
+                    fontNumber = self._faceNumberForName(file, fontName) if fontName else 0
+
+            Font.__init__(self, fontFile, fontName, fontNumber)
+
+        # Font's Glyph objects, kept in least recently used order
+        # so the oldest can be dropped when there are too many
+        self._glyphs = OrderedDict(self._glyphs)
+        self._faceNumber = fontNumber
+
+        # the cmap, and a map from glyph names to their character codes, made on first use
+        self._cmap = None
+        self._namesToCodes = None
+
+    @property
+    def faceNumber(self):
+        """\
+        The index of the font in its font collection, or 0 if the file isn't a collection.
+        """
+        return self._faceNumber
+
+        # the cmap, and a map from glyph names to their character codes, made on first use
+        self._cmap = None
+        self._namesToCodes = None
+
+    @classmethod
+    def _faceNumberForName(cls, file, fontName):
+        """\
+        Return the index of the font with the given PostScript or full name
+        in the font collection in file, or 0 if file isn't a font collection.
+        Only the name tables are read.
+        """
+        file.seek(0)
+        if file.read(4) != b"ttcf":
+            return 0
+
+        collection = TTCollection(file, lazy=True)
+        for index, face in enumerate(collection.fonts):
+            if fontName in (cls._getPostScriptName(face), cls._getFullName(face)):
+                return index
+
+        raise ValueError(f"There is no font named “{fontName}” in the font collection.")
+
+    def close(self):
+        """\
+        Close the font's file. The font can't be used after this.
+        """
+        self._ttFont.close()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
 
     def __contains__(self, item):
         return item in self._ttFont
@@ -209,12 +302,26 @@ class GTFont(Font):
     def fullName(self):
         return self._getFullName(self._ttFont)
 
+    @property
+    def cmap(self):
+        """\
+        The font's best Unicode cmap, as a dictionary that maps character codes to glyph names.
+        """
+        if self._cmap is None:
+            self._cmap = self._ttFont.getBestCmap() or {}
+        return self._cmap
+
     def glyphNameForCharacterCode(self, charCode):
-        return self._ttFont.getBestCmap()[charCode]
+        return self.cmap[charCode]
 
     @property
     def glyphSet(self):
-        return self._ttFont.getGlyphSet()
+        # Font made a glyph set when it loaded the font, so use that one
+        # instead of making a new one every time. (A lazily loaded font
+        # makes its glyph set here, the first time it's needed.)
+        if self._ttGlyphSet is None:
+            self._ttGlyphSet = self._ttFont.getGlyphSet()
+        return self._ttGlyphSet
 
     @property
     def hmtxMetrics(self):
@@ -245,12 +352,18 @@ class GTFont(Font):
         """
         glyphs = self._glyphs
         if glyphName in glyphs:
+            glyphs.move_to_end(glyphName)
             return glyphs[glyphName]
-        if glyphName not in self._ttGlyphSet:
+        if glyphName not in self.glyphSet:
             raise ValueError(f"Unknown glyph name: “{glyphName}”.")
         # glyph = GTGlyph(self, glyphName)
         glyph = Glyph(glyphName, self)
         glyphs[glyphName] = glyph
+
+        # forget the least recently used glyph
+        if len(glyphs) > self.glyphCacheSize:
+            glyphs.popitem(last=False)
+
         return glyph
 
 
@@ -269,12 +382,21 @@ class GTFont(Font):
         charCode = ord(char) if type(char) == type("") else char
         return self.glyphForName(self.glyphNameForCharacterCode(charCode))
 
-    def unicodeForName(self, charName):
-        for code, name in self._ttFont.getBestCmap().items():
-            if name == charName:
-                return code
+    def unicodesForName(self, charName):
+        """\
+        Return a list of the character codes that map to the given glyph name.
+        """
+        if self._namesToCodes is None:
+            namesToCodes = {}
+            for code, name in self.cmap.items():
+                namesToCodes.setdefault(name, []).append(code)
+            self._namesToCodes = namesToCodes
 
-        return None
+        return self._namesToCodes.get(charName, [])
+
+    def unicodeForName(self, charName):
+        codes = self.unicodesForName(charName)
+        return codes[0] if codes else None
 
 def getGlyphFromArgs(args, font):
     if args.glyphName: return font.glyphForName(args.glyphName)
@@ -302,7 +424,17 @@ def main():
         fontPostscriptName = font.postscriptName
         print(f"Drawing glyph {glyph.name()} from font {fontBasename}/{fontPostscriptName}")
 
-        glyphContours = GlyphContours.GTGlyphCoutours(glyph)
+        contours = None
+        if args.cacheDir:
+            def drawContours():
+                pen = SegmentPen(font.glyphSet, GlyphContours.GTGlyphCoutours.logger)
+                font.glyphSet[glyph.name()].draw(pen)
+                return pen.contours
+
+            cache = OutlineCache(args.cacheDir)
+            contours = cache.getContours(cache.keyFor(args.fontFile, font.faceNumber, glyph.name()), drawContours)
+
+        glyphContours = GlyphContours.GTGlyphCoutours(glyph, contours)
         contours = glyphContours.contours
         boundingRect = PathUtilities.GTBoundsRectangle.fromCoutours(contours)
         centerPoint = boundingRect.centerPoint
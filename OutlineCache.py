@@ -0,0 +1,305 @@
+"""\
+A persistent, size-bounded cache of decoded glyph outlines
+
+Created on October 17, 2026
+
+@author Eric Mader
+"""
+
+import os
+import mmap
+import struct
+import hashlib
+import tempfile
+import time
+import numpy as np
+from PackedOutline import PackedOutline
+
+class OutlineCache(object):
+    """\
+    Stores glyph outlines on disk as PackedOutline arrays, so that repeated
+    tests of the same fonts don't have to decode and draw the glyphs again.
+
+    Each outline is stored in its own file, named by a hash of the font's
+    content, the face number, the glyph name and a variant string that
+    describes any processing, such as scaling, that was applied to the contours.
+    The files are read through a memory map, so the arrays aren't copied.
+
+    When the total size of the files goes over maxBytes, the least recently
+    used files are removed until it's under lowWaterRatio * maxBytes, so that
+    a full cache doesn't have to evict on every write. A file's modification time records when it was last
+    used, to within touchInterval seconds, so most reads don't write to the disk.
+
+    The cache keeps a running total of the size of the files it writes, and only
+    scans the directory when that goes over maxBytes, or every scanInterval writes
+    to pick up the files that other processes have written.
+
+    The file format is a header followed by the points, contourOffsets and orders
+    arrays, in that order, so that each array is aligned for its type.
+    """
+    magic = b"GTOC"
+    version = 1
+    header = struct.Struct("<4sHHII")  # magic, version, reserved, segmentCount, contourCount
+    suffix = ".outline"
+
+    # a hit only updates the modification time of a file older than this, in seconds
+    touchInterval = 60
+
+    # the number of writes between scans of the directory
+    scanInterval = 256
+
+    # the fraction of maxBytes that eviction reduces the cache to
+    lowWaterRatio = 0.75
+
+    # font hashes for this process, keyed by (path, size, mtime)
+    _fontHashes = {}
+
+    def __init__(self, directory, maxBytes=256 * 1024 * 1024):
+        self._directory = directory
+        self._maxBytes = maxBytes
+        self._totalSize = None  # unknown until the first scan
+        self._putsSinceScan = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def _hashFile(cls, hash, path):
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                hash.update(block)
+
+    @classmethod
+    def fontHash(cls, fontFile):
+        """\
+        Return the SHA-256 hash of the content of fontFile, as a hex string.
+        If fontFile is a directory, such as a UFO, the hash covers the names
+        and contents of all of the files in it.
+        """
+        stat = os.stat(fontFile)
+        statKey = (os.path.abspath(fontFile), stat.st_size, stat.st_mtime_ns)
+        if statKey in cls._fontHashes: return cls._fontHashes[statKey]
+
+        hash = hashlib.sha256()
+        if os.path.isdir(fontFile):
+            for root, dirs, files in os.walk(fontFile):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    hash.update(os.path.relpath(path, fontFile).encode("utf-8") + b"\0")
+                    cls._hashFile(hash, path)
+        else:
+            cls._hashFile(hash, fontFile)
+
+        fontHash = hash.hexdigest()
+        cls._fontHashes[statKey] = fontHash
+        return fontHash
+
+    def keyFor(self, fontFile, fontNumber, glyphName, variant=""):
+        """\
+        Return the cache key for the given glyph. fontNumber is the index of the
+        face in a font collection, as the font resolved it, such as GTFont.faceNumber.
+        Faces that were chosen by name must still use their index here, so that all
+        the tools use the same key for the same face.
+        """
+        keyString = f"{self.fontHash(fontFile)}:{fontNumber or 0}:{glyphName}:{variant}"
+        return hashlib.sha256(keyString.encode("utf-8")).hexdigest()
+
+    def _pathFor(self, key):
+        return os.path.join(self._directory, key + self.suffix)
+
+    def get(self, key):
+        """\
+        Return the PackedOutline stored for key, or None if there isn't one.
+        Its arrays are views of a memory map of the file, which is closed
+        when they're no longer used.
+        """
+        packed, _ = self._read(key)
+        return packed
+
+    def _read(self, key):
+        # Return the PackedOutline stored for key and the memory map that its
+        # arrays are views of, or (None, None) if there isn't a valid entry.
+        path = self._pathFor(key)
+        try:
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                modified = os.fstat(file.fileno()).st_mtime
+            if time.time() - modified > self.touchInterval: os.utime(path)
+        except (OSError, ValueError):
+            return None, None
+
+        if len(buffer) < self.header.size:
+            buffer.close()
+            return None, None
+
+        magic, version, _, segmentCount, contourCount = self.header.unpack_from(buffer)
+        if magic != self.magic or version != self.version:
+            buffer.close()
+            return None, None
+
+        maxPoints = PackedOutline.maxOrder + 1
+        pointsOffset = self.header.size
+        offsetsOffset = pointsOffset + segmentCount * maxPoints * 2 * 8
+        ordersOffset = offsetsOffset + (contourCount + 1) * 4
+        if len(buffer) != ordersOffset + segmentCount:
+            buffer.close()
+            return None, None
+
+        points = np.frombuffer(buffer, dtype="<f8", count=segmentCount * maxPoints * 2, offset=pointsOffset)
+        contourOffsets = np.frombuffer(buffer, dtype="<i4", count=contourCount + 1, offset=offsetsOffset)
+        orders = np.frombuffer(buffer, dtype=np.int8, count=segmentCount, offset=ordersOffset)
+
+        return PackedOutline(points.reshape(segmentCount, maxPoints, 2), orders, contourOffsets), buffer
+
+    def put(self, key, packed):
+        """\
+        Store the given PackedOutline under key, then remove
+        old entries if the cache is over its size limit.
+        """
+        data = [
+            self.header.pack(self.magic, self.version, 0, packed.segmentCount, packed.contourCount),
+            packed.points.astype("<f8", copy=False).tobytes(),
+            packed.contourOffsets.astype("<i4", copy=False).tobytes(),
+            packed.orders.astype(np.int8, copy=False).tobytes()
+        ]
+
+        # write to a temporary file and rename it, so that
+        # other processes never see a partially written file
+        fd, tempPath = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in data: file.write(chunk)
+            os.replace(tempPath, self._pathFor(key))
+        except OSError:
+            if os.path.exists(tempPath): os.remove(tempPath)
+            raise
+
+        # if the file replaced an older one, this overcounts,
+        # which at worst makes the next scan come sooner
+        self._putsSinceScan += 1
+        if self._totalSize is None or self._putsSinceScan >= self.scanInterval:
+            self.evict()
+        else:
+            self._totalSize += sum(len(chunk) for chunk in data)
+            if self._totalSize > self._maxBytes: self.evict()
+
+    def getContours(self, key, computeContours):
+        """\
+        Return the contours stored under key. If there aren't any,
+        call computeContours() to get them and store them.
+        """
+        packed, buffer = self._read(key)
+        if packed is not None:
+            contours = packed.toContours()
+
+            # the contours are copies, so let go of the views of the map and close it
+            del packed
+            buffer.close()
+            return contours
+
+        contours = computeContours()
+        self.put(key, PackedOutline.fromContours(contours))
+        return contours
+
+    def evict(self):
+        """\
+        If the total size of the cache is more than maxBytes, remove the least
+        recently used entries until it's no more than lowWaterRatio * maxBytes.
+        """
+        entries = []
+        totalSize = 0
+        with os.scandir(self._directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(self.suffix): continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                totalSize += stat.st_size
+
+        if totalSize > self._maxBytes:
+            lowWater = self._maxBytes * self.lowWaterRatio
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # another process may have removed it
+                totalSize -= size
+                if totalSize <= lowWater: break
+
+        self._totalSize = totalSize
+        self._putsSinceScan = 0
+
+def test():
+    contours = [[[(0, 0), (100, 0)], [(100, 0), (150, 50), (100, 100)],
+                 [(100, 100), (60, 140), (20, 60), (0, 100)], [(0, 100), (0, 0)]]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = OutlineCache(directory)
+        key = cache.keyFor(__file__, 0, "test")
+        print(f"before put: {cache.get(key)}")
+        print(f"round trip: {cache.getContours(key, lambda: contours) == contours}")
+        print(f"from cache: {cache.getContours(key, lambda: None) == contours}")
+
+        cache = OutlineCache(directory, maxBytes=0)
+        cache.evict()
+        print(f"after eviction: {cache.get(key)}")
+
+        testCollectionFaces(directory)
+
+def testCollectionFaces(directory):
+    import logging
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTCollection
+    from GlyphTest import GTFont
+    from SegmentPen import SegmentPen
+
+    # two faces in one collection, whose glyph “a” has a different width in each
+    def makeFace(name, width):
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 100))
+        pen.lineTo((width, 100))
+        pen.lineTo((width, 0))
+        pen.closePath()
+
+        builder = FontBuilder(1000, isTTF=True)
+        builder.setupGlyphOrder([".notdef", "a"])
+        builder.setupCharacterMap({ord("a"): "a"})
+        builder.setupGlyf({".notdef": TTGlyphPen(None).glyph(), "a": pen.glyph()})
+        builder.setupHorizontalMetrics({".notdef": (0, 0), "a": (width, 0)})
+        builder.setupHorizontalHeader()
+        builder.setupNameTable({"familyName": name, "styleName": "Regular", "psName": name})
+        builder.setupOS2()
+        builder.setupPost()
+        return builder.font
+
+    collectionFile = os.path.join(directory, "faces.ttc")
+    collection = TTCollection()
+    collection.fonts = [makeFace("FaceOne", 100), makeFace("FaceTwo", 200)]
+    collection.save(collectionFile)
+
+    # open the faces by name, the way --font file.ttc/name does, and load
+    # each one's “a” twice: once drawn and stored, and once from the cache
+    cache = OutlineCache(os.path.join(directory, "faces"))
+    for _ in range(2):
+        widths = []
+        for name in ["FaceOne", "FaceTwo"]:
+            with GTFont(collectionFile, fontName=name, lazy=True) as font:
+                def drawContours():
+                    pen = SegmentPen(font.glyphSet, logging.getLogger("outline-cache-test"))
+                    font.glyphSet["a"].draw(pen)
+                    return pen.contours
+
+                contours = cache.getContours(cache.keyFor(collectionFile, font.faceNumber, "a"), drawContours)
+                assert contours == drawContours(), f"{name} got another face's outline from the cache"
+                widths.append(max(x for contour in contours for segment in contour for x, _ in segment))
+
+        assert widths == [100, 200], f"widths = {widths}"
+
+    print("collection faces: distinct")
+
+if __name__ == "__main__":
+    test()
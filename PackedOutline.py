@@ -0,0 +1,260 @@
+"""\
+A compact glyph outline that stores all of its segments in NumPy arrays
+
+Created on October 17, 2026
+
+@author Eric Mader
+"""
+
+import numpy as np
+import BezierUtilities as butils
+import PathUtilities
+from Bezier import Bezier, BOutline
+
+class PackedOutline(object):
+    """\
+    An outline stored as a structure of arrays:
+
+     - points: an (S x 4 x 2) array of the control points of the S segments.
+       Segments with fewer than four control points are padded with their end point.
+     - orders: an (S) array of the order of each segment.
+     - contourOffsets: a (C + 1) array of indices into points, where contour c
+       is made up of the segments contourOffsets[c] to contourOffsets[c + 1] - 1.
+
+    Bounds, directions and extrema are computed for all segments at once.
+    """
+    maxOrder = 3
+
+    def __init__(self, points, orders, contourOffsets):
+        self._points = points
+        self._orders = orders
+        self._contourOffsets = contourOffsets
+        self._coefficients = None
+        self._extrema = None
+        self._bounds = None
+        self._directions = None
+
+    @classmethod
+    def fromContours(cls, contours):
+        """\
+        Return a PackedOutline for a list of contours, each of which is
+        a list of segments, such as the contours from a SegmentPen.
+        """
+        segmentCount = sum(len(contour) for contour in contours)
+        points = np.empty((segmentCount, cls.maxOrder + 1, 2))
+        orders = np.empty(segmentCount, dtype=np.int8)
+        contourOffsets = np.empty(len(contours) + 1, dtype=np.int32)
+
+        index = 0
+        contourOffsets[0] = 0
+        for c, contour in enumerate(contours):
+            for segment in contour:
+                order = len(segment) - 1
+                if not 1 <= order <= cls.maxOrder:
+                    raise ValueError(f"Can't pack a segment of order {order}.")
+
+                points[index, :order + 1] = segment
+                points[index, order + 1:] = segment[-1]
+                orders[index] = order
+                index += 1
+            contourOffsets[c + 1] = index
+
+        return PackedOutline(points, orders, contourOffsets)
+
+    @classmethod
+    def fromOutline(cls, outline):
+        """\
+        Return a PackedOutline for the given BOutline.
+        """
+        return cls.fromContours([[curve.controlPoints for curve in contour] for contour in outline])
+
+    def segment(self, index):
+        """\
+        Return the control points of the given segment as a list of (x, y) tuples.
+        """
+        order = self._orders[index]
+        return [tuple(p) for p in self._points[index, :order + 1].tolist()]
+
+    def contour(self, index):
+        """\
+        Return the given contour as a list of segments.
+        """
+        start, end = self._contourOffsets[index:index + 2]
+        return [self.segment(s) for s in range(start, end)]
+
+    def toContours(self):
+        """\
+        Return the outline as a list of contours, in the same form as SegmentPen.contours.
+        """
+        return [self.contour(c) for c in range(self.contourCount)]
+
+    def toOutline(self):
+        """\
+        Return the outline as a BOutline.
+        """
+        return BOutline(self.toContours())
+
+    def __len__(self):
+        return len(self._orders)
+
+    @property
+    def points(self):
+        return self._points
+
+    @property
+    def orders(self):
+        return self._orders
+
+    @property
+    def contourOffsets(self):
+        return self._contourOffsets
+
+    @property
+    def segmentCount(self):
+        return len(self._orders)
+
+    @property
+    def contourCount(self):
+        return len(self._contourOffsets) - 1
+
+    @property
+    def nbytes(self):
+        """\
+        The number of bytes used by the arrays of the outline.
+        """
+        return self._points.nbytes + self._orders.nbytes + self._contourOffsets.nbytes
+
+    def _segmentsOfOrder(self, order):
+        return np.nonzero(self._orders == order)[0]
+
+    @property
+    def coefficients(self):
+        """\
+        An (S x 4 x 2) array of the power basis coefficients of all of the segments,
+        padded with zeros for segments with an order less than three.
+        """
+        if self._coefficients is None:
+            coefficients = np.zeros_like(self._points)
+            for order in range(1, self.maxOrder + 1):
+                segments = self._segmentsOfOrder(order)
+                basis = butils.powerBasisMatrix(order)
+                coefficients[segments, :order + 1] = basis @ self._points[segments, :order + 1]
+
+            self._coefficients = coefficients
+
+        return self._coefficients
+
+    def evaluate(self, ts):
+        """\
+        Evaluate every segment at the parameter values in ts,
+        which is an (S x N) array. Returns an (S x N x 2) array of points.
+        """
+        tPowers = np.power.outer(np.asarray(ts, dtype=float), np.arange(self.maxOrder + 1))
+        return np.einsum("snk,skd->snd", tPowers, self.coefficients)
+
+    @property
+    def extrema(self):
+        """\
+        An (S x 2 x 3) array of the extrema of each segment in x and y, computed
+        like Bezier.extrema: the roots of the first derivative, followed by the root
+        of the second derivative for cubic segments. Missing values are NaN.
+        """
+        if self._extrema is None:
+            extrema = np.full((self.segmentCount, 2, 3), np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                segments = self._segmentsOfOrder(2)
+                p = self._points[segments]
+                d0 = 2 * (p[:, 1] - p[:, 0])
+                d1 = 2 * (p[:, 2] - p[:, 1])
+                extrema[segments, :, 0] = self._linearRoots(d0, d1)
+
+                segments = self._segmentsOfOrder(3)
+                p = self._points[segments]
+                a = 3 * (p[:, 1] - p[:, 0])
+                b = 3 * (p[:, 2] - p[:, 1])
+                c = 3 * (p[:, 3] - p[:, 2])
+                extrema[segments, :, 0], extrema[segments, :, 1] = self._quadraticRoots(a, b, c)
+                extrema[segments, :, 2] = self._linearRoots(2 * (b - a), 2 * (c - b))
+
+            extrema[(extrema < 0) | (extrema > 1)] = np.nan
+            self._extrema = extrema
+
+        return self._extrema
+
+    @staticmethod
+    def _linearRoots(a, b):
+        # vectorized version of the linear case of butils.droots()
+        return np.where(a != b, a / (a - b), np.nan)
+
+    @staticmethod
+    def _quadraticRoots(a, b, c):
+        # vectorized version of the quadratic case of butils.droots()
+        d = a - 2 * b + c
+        m1 = -np.sqrt(b * b - a * c)
+        m2 = -a + b
+        v1 = np.where(d != 0, -(m1 + m2) / d, np.where(b != c, (2 * b - c) / (2 * (b - c)), np.nan))
+        v2 = np.where(d != 0, -(-m1 + m2) / d, np.nan)
+        return v1, v2
+
+    @property
+    def bounds(self):
+        """\
+        An (S x 4) array of the bounds of each segment: min x, min y, max x, max y.
+        """
+        if self._bounds is None:
+            bounds = np.empty((self.segmentCount, 4))
+            for dim in range(2):
+                ends = np.broadcast_to([0.0, 1.0], (self.segmentCount, 2))
+                ts = np.concatenate([ends, self.extrema[:, dim]], axis=1)
+                values = self.evaluate(np.nan_to_num(ts, nan=0.0))[..., dim]
+                bounds[:, dim] = values.min(axis=1)
+                bounds[:, dim + 2] = values.max(axis=1)
+
+            self._bounds = bounds
+
+        return self._bounds
+
+    @property
+    def boundsRectangle(self):
+        """\
+        A GTBoundsRectangle that encloses the whole outline.
+        """
+        if self.segmentCount == 0: return PathUtilities.GTBoundsRectangle()
+
+        minX, minY = self.bounds[:, :2].min(axis=0)
+        maxX, maxY = self.bounds[:, 2:].max(axis=0)
+        return PathUtilities.GTBoundsRectangle((minX, minY), (maxX, maxY))
+
+    @property
+    def directions(self):
+        """\
+        An (S) array of the direction of each segment, computed like Bezier.direction.
+        """
+        if self._directions is None:
+            # the padding points repeat the end point, so they don't change the direction
+            dy = np.diff(self._points[:, :, 1], axis=1)
+            up = (dy >= 0).all(axis=1)
+            down = (dy <= 0).all(axis=1)
+
+            directions = np.full(self.segmentCount, Bezier.dir_mixed, dtype=np.int8)
+            directions[down] = Bezier.dir_down
+            directions[up] = Bezier.dir_up
+            directions[up & down & (self._orders == 1)] = Bezier.dir_flat
+            self._directions = directions
+
+        return self._directions
+
+def test():
+    contours = [[[(0, 0), (100, 0)], [(100, 0), (150, 50), (100, 100)],
+                 [(100, 100), (60, 140), (20, 60), (0, 100)], [(0, 100), (0, 0)]]]
+    packed = PackedOutline.fromContours(contours)
+    outline = packed.toOutline()
+
+    print(f"contours round trip: {packed.toContours() == contours}")
+    print(f"bytes: {packed.nbytes}")
+    print(f"bounds: {packed.boundsRectangle}, BOutline bounds: {outline.boundsRectangle}")
+    print(f"directions: {packed.directions.tolist()}")
+    print(f"BOutline directions: {[curve.direction for contour in outline for curve in contour]}")
+
+if __name__ == "__main__":
+    test()
@@ -7,6 +7,8 @@ Created on July 7, 2020
 """
 
 import math, random
+import bisect
+import numpy as np
 from colorsys import hls_to_rgb
 from FontDocTools.Color import Color
 from BezierUtilities import lli
@@ -220,6 +222,8 @@ class GTBoundsRectangle(object):
     """\
     A bounds rectangle for a set of points.
     """
+    __slots__ = ("left", "right", "top", "bottom")
+
     def __init__(self, *points):
         """\
         Initialize a bounds rectangle that encloses the given
@@ -227,20 +231,20 @@ class GTBoundsRectangle(object):
 
         Returns an empty rectangle if the list is empty.
         """
-        right = top = -32768
-        left = bottom = 32768
+        self.right = self.top = -32768
+        self.left = self.bottom = 32768
+        self._addPoints(points)
 
-        for point in points:
-            px, py = point
-            left = min(left, px)
-            right = max(right, px)
-            bottom = min(bottom, py)
-            top = max(top, py)
+    def _addPoints(self, points):
+        left, bottom, right, top = self.left, self.bottom, self.right, self.top
+
+        for px, py in points:
+            if px < left: left = px
+            if px > right: right = px
+            if py < bottom: bottom = py
+            if py > top: top = py
 
-        self.left = left
-        self.right = right
-        self.top = top
-        self.bottom = bottom
+        self.left, self.bottom, self.right, self.top = left, bottom, right, top
 
     @staticmethod
     def fromContour(contour):
@@ -248,8 +252,7 @@ class GTBoundsRectangle(object):
         Return a BoundsRectangle that encloses the points in contour.
         """
         bounds = GTBoundsRectangle()
-        for segment in contour:
-            bounds = bounds.union(GTBoundsRectangle(*segment))
+        bounds._addPoints(point for segment in contour for point in segment)
 
         return bounds
 
@@ -259,8 +262,7 @@ class GTBoundsRectangle(object):
         Return a BoundsRectangle that encloses the points in contours.
         """
         bounds = GTBoundsRectangle()
-        for contour in contours:
-            bounds = bounds.union(GTBoundsRectangle.fromContour(contour))
+        bounds._addPoints(point for contour in contours for segment in contour for point in segment)
 
         return bounds
 
@@ -360,6 +362,26 @@ class GTBoundsRectangle(object):
 
         return GTBoundsRectangle((newLeft, newBottom), (newRight, newTop))
 
+    def unionInPlace(self, other):
+        """\
+        Extend this rectangle to enclose other. Returns this rectangle.
+        """
+        if other.left < self.left: self.left = other.left
+        if other.bottom < self.bottom: self.bottom = other.bottom
+        if other.right > self.right: self.right = other.right
+        if other.top > self.top: self.top = other.top
+
+        return self
+
+    def overlaps(self, other):
+        """\
+        Test if this rectangle and other have any points in common.
+        This is the same as intersection(other) is not None, but
+        doesn't allocate a new rectangle.
+        """
+        return max(self.left, other.left) <= min(self.right, other.right) and \
+            max(self.bottom, other.bottom) <= min(self.top, other.top)
+
     def intersection(self, other):
         """\
         Return a rectangle that is the intersection of this rectangle and other.
@@ -372,6 +394,167 @@ class GTBoundsRectangle(object):
         if newRight < newLeft or newTop < newBottom: return None  # maybe want <=, >=?
         return GTBoundsRectangle((newLeft, newBottom), (newRight, newTop))
 
+class GTBoundsArray(object):
+    """\
+    The bounds rectangles of a list of segments, stored as arrays
+    of their left, bottom, right and top coordinates.
+
+    The bounds are computed from an (N x K x 2) array of the points
+    of N segments. Segments with fewer than K points are padded with
+    copies of one of their points, which doesn't change their bounds.
+
+    These are the bounds of all of each segment's points, including the
+    off-curve control points, like GTBoundsRectangle.fromContour, so a
+    curve's bounds can be bigger than the tight bounds from its extrema.
+    They're exact for lines, and are a safe first test for culling curves.
+    """
+    def __init__(self, points):
+        """\
+        Initialize the bounds of the segments in points, which
+        is an (N x K x 2) array.
+        """
+        points = np.asarray(points, dtype=float)
+        mins = points.min(axis=1)
+        maxs = points.max(axis=1)
+
+        self.left, self.bottom = mins[:, 0], mins[:, 1]
+        self.right, self.top = maxs[:, 0], maxs[:, 1]
+
+    @classmethod
+    def fromSegments(cls, segments):
+        """\
+        Return a GTBoundsArray for a list of segments of any order.
+        """
+        maxPoints = max((len(segment) for segment in segments), default=1)
+        points = np.empty((len(segments), maxPoints, 2))
+        for i, segment in enumerate(segments):
+            count = len(segment)
+            points[i, :count] = segment
+            points[i, count:] = segment[-1]
+
+        return cls(points)
+
+    @classmethod
+    def fromContours(cls, contours):
+        """\
+        Return a GTBoundsArray for all of the segments in contours.
+        """
+        return cls.fromSegments([segment for contour in contours for segment in contour])
+
+    def __len__(self):
+        return len(self.left)
+
+    def __getitem__(self, index):
+        """\
+        Return the bounds of the segment at index as a GTBoundsRectangle.
+        """
+        return GTBoundsRectangle((self.left[index], self.bottom[index]), (self.right[index], self.top[index]))
+
+    @property
+    def points(self):
+        """\
+        An (N x 4) array of the min x, min y, max x, max y coordinates of each segment.
+        """
+        return np.stack([self.left, self.bottom, self.right, self.top], axis=1)
+
+    @property
+    def boundsRectangle(self):
+        """\
+        A GTBoundsRectangle that encloses all of the segments.
+        """
+        if len(self) == 0: return GTBoundsRectangle()
+
+        return GTBoundsRectangle((self.left.min(), self.bottom.min()), (self.right.max(), self.top.max()))
+
+    def crossesX(self, x):
+        """\
+        Return a boolean array that tells which bounds include the given x coordinate.
+        """
+        return (self.left <= x) & (x <= self.right)
+
+    def crossesY(self, y):
+        """\
+        Return a boolean array that tells which bounds include the given y coordinate.
+        """
+        return (self.bottom <= y) & (y <= self.top)
+
+    def overlaps(self, rectangle):
+        """\
+        Return a boolean array that tells which bounds overlap the given GTBoundsRectangle.
+        """
+        return (np.maximum(self.left, rectangle.left) <= np.minimum(self.right, rectangle.right)) & \
+            (np.maximum(self.bottom, rectangle.bottom) <= np.minimum(self.top, rectangle.top))
+
+class GTIntervalIndex(object):
+    """\
+    An index of a list of items, each of which covers a closed interval,
+    that finds the k items whose interval contains a given value in
+    O(log n + k log k) time.
+
+    The distinct interval end points divide the line into elementary slots:
+    one for each end point, and one for each open gap between neighboring
+    end points. Each item covers a range of slots, which is stored in a segment
+    tree over the slots: the index of the item is kept in the O(log n) nodes
+    whose slot ranges make up the item's range, so the index takes O(n log n)
+    space. A query is a binary search for the slot, then a walk from the slot's
+    leaf to the root, gathering the items in the nodes on the way, which are
+    sorted back into the order of the original list.
+    """
+    def __init__(self, items, intervals):
+        """\
+        Initialize an index of items, where intervals[i] is
+        the (low, high) interval covered by items[i].
+        """
+        endPoints = sorted({v for interval in intervals for v in interval})
+        slotCount = 2 * len(endPoints) - 1 if endPoints else 0
+
+        # the leaves of the tree are nodes leafBase .. leafBase + slotCount - 1,
+        # and the children of node i are nodes 2i and 2i + 1
+        leafBase = 1
+        while leafBase < slotCount: leafBase *= 2
+
+        nodes = {}
+        for index, (low, high) in enumerate(intervals):
+            first = leafBase + 2 * bisect.bisect_left(endPoints, low)
+            end = leafBase + 2 * bisect.bisect_left(endPoints, high) + 1
+            while first < end:
+                if first & 1:
+                    nodes.setdefault(first, []).append(index)
+                    first += 1
+                if end & 1:
+                    end -= 1
+                    nodes.setdefault(end, []).append(index)
+                first //= 2
+                end //= 2
+
+        self._items = list(items)
+        self._endPoints = endPoints
+        self._leafBase = leafBase
+        self._nodes = nodes
+
+    def itemsContaining(self, value):
+        """\
+        Return a list of all the items whose interval contains value.
+        """
+        endPoints = self._endPoints
+        i = bisect.bisect_left(endPoints, value)
+
+        if i < len(endPoints) and endPoints[i] == value:
+            slot = 2 * i
+        elif 0 < i < len(endPoints):
+            slot = 2 * i - 1
+        else:
+            return []
+
+        indices = []
+        node = self._leafBase + slot
+        while node > 0:
+            indices.extend(self._nodes.get(node, ()))
+            node //= 2
+
+        items = self._items
+        return [items[index] for index in sorted(indices)]
+
 def pointXY(point):
     if isinstance(point, complex):
         return point.real, point.imag
@@ -478,6 +661,33 @@ def flatten(contours):
     """
     return [segment for contour in contours for segment in contour]
 
+def contoursToArray(contours):
+    """\
+    Return all the points in the given contours as an (N x 2) NumPy array,
+    along with the lengths of each segment, which contoursFromArray()
+    uses to rebuild the contours.
+    """
+    shape = [[len(segment) for segment in contour] for contour in contours]
+    points = [point for contour in contours for segment in contour for point in segment]
+    return np.array(points, dtype=float).reshape(-1, 2), shape
+
+def contoursFromArray(points, shape):
+    """\
+    Rebuild a list of contours from an (N x 2) array of points and the
+    segment lengths returned by contoursToArray().
+    """
+    points = [tuple(p) for p in points.tolist()]
+    contours = []
+    index = 0
+    for segmentLengths in shape:
+        contour = []
+        for segmentLength in segmentLengths:
+            contour.append(points[index:index + segmentLength])
+            index += segmentLength
+        contours.append(contour)
+
+    return contours
+
 # There must be a better way to do this...
 def pointOnLine(point, line):
     """\
@@ -553,6 +763,11 @@ class GTTransform(object):
         """
         self._transform = GTTransform.concatenateMatrices(*matrices)
 
+        # If the last column is [0, 0, 1] the transform is affine,
+        # so points can be transformed without the perspective divide.
+        [a, b, p], [c, d, q], [m, n, s] = self._transform
+        self._affine = p == 0 and q == 0 and s == 1
+
     @staticmethod
     def _matrix(a=1.0, b=0.0, c=0.0, d=1.0, m=0.0, n=0.0, p=0.0, q=0.0, s=1.0):
         """\
@@ -630,6 +845,13 @@ class GTTransform(object):
         """
         return self._transform
 
+    @property
+    def isAffine(self):
+        """\
+        Return True if the transform is affine.
+        """
+        return self._affine
+
     @classmethod
     def translate(cls, fromPoint, toPoint):
         """\
@@ -762,15 +984,35 @@ class GTTransform(object):
             py = point.imag
         else:
             px, py = point
-        rp = GTTransform.multiplyRowByMatrix([px, py, 1], self.transform)
 
-        # in the general case, rp[2] may not be 1, so
-        # normalize to 1.
-        rx = rp[0]/rp[2]
-        ry = rp[1]/rp[2]
+        if self._affine:
+            [a, b, _], [c, d, _], [m, n, _] = self._transform
+            rx = px * a + py * c + m
+            ry = px * b + py * d + n
+        else:
+            rp = GTTransform.multiplyRowByMatrix([px, py, 1], self.transform)
+
+            # in the general case, rp[2] may not be 1, so
+            # normalize to 1.
+            rx = rp[0]/rp[2]
+            ry = rp[1]/rp[2]
 
         return complex(rx, ry) if complexPoint else (rx, ry)
 
+    def applyToArray(self, points):
+        """\
+        Apply the transformation to an (N x 2) array of points.
+        Returns a new (N x 2) array.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        matrix = np.array(self._transform, dtype=float)
+
+        if self._affine:
+            return points @ matrix[:2, :2] + matrix[2, :2]
+
+        rp = points @ matrix[:2] + matrix[2]
+        return rp[:, :2] / rp[:, 2:]
+
     def applyToSegment(self, segment):
         """\
         Apply the transform to all points in the given segment.
@@ -797,6 +1039,12 @@ class GTTransform(object):
         """\
         Apply the transform to each contour in contours.
         """
+        firstPoint = next((segment[0] for contour in contours for segment in contour), None)
+        if firstPoint is not None and not isinstance(firstPoint, complex):
+            # transform all of the points at once
+            points, shape = contoursToArray(contours)
+            return contoursFromArray(self.applyToArray(points), shape)
+
         transformed = []
         for contour in contours:
             transformed.append(self.applyToContour(contour))
@@ -7,33 +7,33 @@ Created on October 26, 2020
 """
 
 import os
+import copy
+import traceback
 from sys import argv, exit, stderr
-import xml.etree.ElementTree as ET
 import re
 from io import StringIO
 import math
+import time
 import logging
 import warnings
 import statistics
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
 import scipy.stats
-import statsmodels.api
-import CharNames  # From UnicodeData...
+from fontTools.pens.boundsPen import ControlBoundsPen
 from GlyphTest import GTFont
 from Bezier import Bezier, BOutline, drawOutline
 import BezierUtilities as buitls
 from SegmentPen import SegmentPen
+from OutlineCache import OutlineCache
 from SVGPathPen import SVGPathPen
 from svgpathtools import Line, Path, is_bezier_segment, wsvg
 from SVGPathOutline import SVGPathOutline, SVGPathContour, SVGPathSegment
 import SVGPathUtilities
 from UFOFont import UFOFont
 import PathUtilities
-import ContourPlotter
+from ScanlineIntersector import ScanlineIntersector
 from TestArgumentIterator import TestArgs
-import TextUtilities
+from ResultsSink import ResultsSink
 
 # Polynomial = np.polynomial.Polynomial
 
@@ -51,6 +51,10 @@ class RasterSamplingTestArgs(TestArgs):
         self.outdir = ""
         # self.indir = ""
         self.silent = False
+        self.metricsOnly = False
+        self.resultsFile = None
+        self.glyphSpecs = None
+        self.allGlyphs = False
         TestArgs.__init__(self)
 
     @classmethod
@@ -68,9 +72,59 @@ class RasterSamplingTestArgs(TestArgs):
             widthMethod = arguments.nextExtra("width method")
             if widthMethod in self.widthMethods.keys():
                 self.widthMethod = self.widthMethods[widthMethod]
+        elif argument == "--metrics":
+            self.metricsOnly = True
+        elif argument == "--results":
+            self.resultsFile = arguments.nextExtra("results file")
+        elif argument == "--glyphs":
+            self.glyphSpecs = self.getGlyphSpecs(arguments.getGlyphList())
+        elif argument == "--allGlyphs":
+            self.allGlyphs = True
         else:
             TestArgs.processArgument(self, argument, arguments)
 
+    def completeInit(self):
+        if self.glyphSpecs or self.allGlyphs:
+            if not self.fontFile:
+                raise ValueError("Missing “--font” option.")
+            if self.glyphSpecs and self.allGlyphs:
+                raise ValueError("Can't use both “--glyphs” and “--allGlyphs”.")
+            if any(value is not None for value in [self.glyphName, self.glyphID, self.charCode]):
+                raise ValueError("Can't use “--glyph” with “--glyphs” or “--allGlyphs”.")
+        else:
+            TestArgs.completeInit(self)
+
+    @classmethod
+    def getGlyphSpecs(cls, specs):
+        """\
+        Return a list of (attribute, value) tuples for the glyphs in the list of specs.
+        Each spec is written like the argument to “--glyph”: a single character,
+        “/” followed by a glyph name, “u” followed by a hex character code, or “gid”
+        followed by a glyph ID. Characters, character codes and glyph IDs can also
+        be ranges, like “a-z”, “u0410-u044F” or “gid10-gid20”.
+        """
+        if not specs:
+            raise ValueError("Missing glyphs for “--glyphs”.")
+
+        glyphSpecs = []
+        for spec in specs:
+            first, _, last = spec.partition("-") if len(spec) > 1 else (spec, "", "")
+            if len(first) == 1 and (not last or len(last) == 1):
+                values = range(ord(first), ord(last or first) + 1)
+                glyphSpecs.extend(("charCode", value) for value in values)
+            elif spec[0] == "/":
+                glyphSpecs.append(("glyphName", spec[1:]))
+            elif first[0] == "u" and (not last or last[0] == "u"):
+                values = range(cls.getHexCharCode(first[1:]), cls.getHexCharCode((last or first)[1:]) + 1)
+                glyphSpecs.extend(("charCode", value) for value in values)
+            elif first[0:3] == "gid" and (not last or last[0:3] == "gid"):
+                values = range(cls.getGlyphID(first[3:]), cls.getGlyphID((last or first)[3:]) + 1)
+                glyphSpecs.extend(("glyphID", value) for value in values)
+            else:
+                raise ValueError(f"Invalid glyph specification “{spec}”.")
+
+        return glyphSpecs
+
 oppositeDirection = {
     Bezier.dir_up: Bezier.dir_down,
     Bezier.dir_down: Bezier.dir_up,
@@ -85,24 +139,90 @@ widthSelection = {
 }
 
 def splitCurve(curve, splits):
-    p1, p2, p3 = curve.controlPoints
-    q1 = p1
-    r3 = p3
-    q2 = PathUtilities.midpoint([p1, p2])
-    r2 = PathUtilities.midpoint([p2, p3])
-    q3 = r1 = PathUtilities.midpoint([q2, r2])
-    q = Bezier([q1, q2, q3])
-    r = Bezier([r1, r2, r3])
-
-    if q.direction != Bezier.dir_mixed:
-        splits.append(q)
-    else:
-        splitCurve(q, splits)
-
-    if r.direction != Bezier.dir_mixed:
-        splits.append(r)
-    else:
-        splitCurve(r, splits)
+    for piece in curve.splitAt([0.5]):
+        if piece.direction != Bezier.dir_mixed:
+            splits.append(piece)
+        else:
+            splitCurve(piece, splits)
+
+class RasterSamplingResult(object):
+    """\
+    The results of a raster sampling test of one glyph: the rasters that
+    measure the stroke widths, the line that best fits their midpoints,
+    and statistics of the widths.
+    """
+    def __init__(self, fontName, glyphName, outline):
+        self.fontName = fontName
+        self.glyphName = glyphName
+        self.outline = outline
+
+        self.baseline = None
+        self.overallBounds = None
+        self.scanlines = []  # the full width rasters that crossed the glyph
+        self.missedRasterCount = 0
+
+        self.rasters = []  # the rasters used to measure the widths
+        self.widthMethod = None  # "Left" or "Right"
+        self.widths = []
+        self.midpoints = []
+
+        # best fit line of the midpoints: x = by + a
+        self.a = self.b = None
+        self.r2 = self.pValue = self.stdErr = None
+        self.strokeLine = None
+        self.strokeAngle = None
+
+        self.minWidth = self.q1 = self.median = self.meanWidth = self.q3 = self.maxWidth = None
+
+        # elapsed times, in seconds
+        self.measureSeconds = self.renderSeconds = self.totalSeconds = None
+
+    # the fields of the records made by record()
+    fields = ["fontFile", "fontNumber", "fontName", "glyphName", "charCode", "glyphID", "widthMethod", "chosenWidthMethod",
+              "a", "b", "r2", "pValue", "stdErr", "strokeAngle",
+              "minWidth", "q1", "median", "meanWidth", "q3", "maxWidth",
+              "rasterCount", "missedRasterCount", "contourCount",
+              "measureSeconds", "renderSeconds", "totalSeconds", "error"]
+
+    @classmethod
+    def record(cls, args, result=None, error=None, totalSeconds=None):
+        """\
+        Return a dictionary of the results of the test described by args,
+        for a ResultsSink. If the test failed, result is None and error is
+        the exception that it raised.
+        """
+        widthMethods = {method: name for name, method in RasterSamplingTestArgs.widthMethods.items()}
+        record = {
+            "fontFile": args.fontFile,
+            "fontNumber": args.fontNumber or 0,
+            "glyphName": args.glyphName,
+            "charCode": args.charCode,
+            "glyphID": args.glyphID,
+            "widthMethod": widthMethods[args.widthMethod],
+            "totalSeconds": totalSeconds,
+            "error": None
+        }
+
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+
+        if result is not None:
+            def number(value): return None if value is None else float(value)
+
+            record.update({
+                "fontName": result.fontName,
+                "glyphName": result.glyphName,
+                "chosenWidthMethod": result.widthMethod,
+                "rasterCount": len(result.rasters),
+                "missedRasterCount": result.missedRasterCount,
+                "contourCount": len(result.outline.contours)
+            })
+
+            for field in ["a", "b", "r2", "pValue", "stdErr", "strokeAngle", "minWidth", "q1", "median",
+                          "meanWidth", "q3", "maxWidth", "measureSeconds", "renderSeconds", "totalSeconds"]:
+                record[field] = number(getattr(result, field))
+
+        return record
 
 class RasterSamplingTest(object):
     def __init__(self, args):
@@ -111,7 +231,29 @@ class RasterSamplingTest(object):
         if args.fontFile.endswith(".ufo"):
             self._font = UFOFont(args.fontFile)
         else:
-            self._font = GTFont(args.fontFile, fontName=args.fontName, fontNumber=args.fontNumber)
+            self._font = GTFont(args.fontFile, fontName=args.fontName, fontNumber=args.fontNumber, lazy=True)
+
+        # a face in a collection can be chosen by name, so record the one
+        # that was opened, for the results and the per-glyph arguments
+        if args.fontNumber is None: args.fontNumber = self._font.faceNumber
+
+        # the font is loaded once, and its glyph set is shared by all the glyphs we test
+        self._glyphSet = self._font.glyphSet
+
+        # as is the outline cache, which keeps track of its size between glyphs
+        self._outlineCache = OutlineCache(args.cacheDir) if args.cacheDir else None
+
+    def close(self):
+        """\
+        Close the font. The test can't be run after this.
+        """
+        self._font.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
 
     @classmethod
     def sortByP0(cls, list):
@@ -123,51 +265,19 @@ class RasterSamplingTest(object):
         return PathUtilities.length(raster.controlPoints)
 
     @classmethod
-    def curvesAtY(cls, curveList, y):
-        return list(filter(lambda curve: curve.boundsRectangle.crossesY(y), curveList))
-
-    @classmethod
-    def leftmostPoint(cls, points, outline):
-        leftmostX = 65536
-        leftmostIndex = -1
-        for index, point in enumerate(points):
-            # if point is None, the curve is a line
-            # that's colinear with the raster
-            if point is not None:
-                ipx, _ = outline.pointXY(point)
-                if ipx < leftmostX:
-                    leftmostX = ipx
-                    leftmostIndex = index
-
-        return leftmostIndex
+    def leftmostCrossing(cls, crossings, direction):
+        # crossings are sorted by x
+        for x, _, crossingDirection in crossings:
+            if crossingDirection == direction: return x
 
-    @classmethod
-    def leftmostIntersection(cls, intersections, curves, direction):
-        leftmostX = 65536
-        leftmostC = -1
-
-        for index, curve in enumerate(curves):
-            if cls.direction(curve) == direction:
-                ipx, _ = curve.pointXY(intersections[index])
-                if ipx < leftmostX:
-                    leftmostX = ipx
-                    leftmostC = index
-
-        return intersections[leftmostC]
+        return None
 
     @classmethod
-    def rightmostIntersection(cls, intersections, curves, direction):
-        rightmostX = -65536
-        rightmostC = -1
+    def rightmostCrossing(cls, crossings, direction):
+        for x, _, crossingDirection in reversed(crossings):
+            if crossingDirection == direction: return x
 
-        for index, curve in enumerate(curves):
-            if cls.direction(curve) == direction:
-                ipx, _ = curve.pointXY(intersections[index])
-                if ipx > rightmostX:
-                    rightmostX = ipx
-                    rightmostC = index
-
-        return intersections[rightmostC]
+        return None
 
     @classmethod
     def bestFit(cls, rasters, outline):
@@ -186,33 +296,6 @@ class RasterSamplingTest(object):
 
         return widths, midpoints, b, a, rValue, pValue, stdErr
 
-    @classmethod
-    def direction(cls, curve):
-        startY = curve.startY
-        endY = curve.endY
-
-        minY = min(startY, endY)
-        maxY = max(startY, endY)
-
-        #
-        # For the purposes of edge detection
-        # we don't care if the curve actually
-        # has a mixed direction, only that it
-        # tends upward or downward.
-        #
-        # ocps = curve.controlPoints[1:-1]
-        # for ocp in ocps:
-        #     ocpx, ocpy = curve.pointXY(ocp)
-        #     if ocpy < minY or ocpy > maxY: return Bezier.dir_mixed
-
-        # if we get here, the curve is either order 1 or
-        # has a uniform direction. Curves with order 2 or higher
-        # with startY and endY equal are likely mixed and got caught
-        # above.
-        if startY < endY: return Bezier.dir_up
-        if startY > endY: return Bezier.dir_down
-        return Bezier.dir_flat
-
     @classmethod
     def pathCoordinate(cls, path):
         # This assumes that the y-coordinate is a positive integer
@@ -255,55 +338,52 @@ class RasterSamplingTest(object):
 
         return leftLine, rightLine
 
-    def run(self):
-        widthMethodStrings = {
-            RasterSamplingTestArgs.widthMethodLeftmost: "",
-            RasterSamplingTestArgs.widthMethodRightmost: "_rightmost",
-            RasterSamplingTestArgs.widthMethodLeastspread: "_leastspread"
-        }
+    def measure(self, args=None):
+        """\
+        Sample the glyph with horizontal rasters and compute the stroke angle,
+        the best fit line and the width statistics, without drawing anything.
+        Returns a RasterSamplingResult.
 
+        args selects the glyph, and defaults to the arguments the test was created with.
+        """
         useBezierOutline = True  # should be in the args...
-        args = self._args
+        args = args or self._args
         font = self._font
-        indent = ""
+        glyphSet = self._glyphSet
 
         fullName = font.fullName
         if fullName.startswith("."): fullName = fullName[1:]
 
-        if args.silent:
-            indent = "    "
-            print(f"{indent}{fullName}:")
-
         level = logging.DEBUG if args.debug else logging.WARNING
         logging.basicConfig(level=level)
         logger = logging.getLogger("raster-sampling-test")
 
         glyph = args.getGlyph(font)
+        if glyph is None: raise ValueError("Glyph not found.")
         glyphName = glyph.name()
-        charCode = font.unicodeForName(glyphName)
-        charInfo = f"U+{charCode:04X} {CharNames.CharNames.getCharName(charCode)}"
-
-        widthMethodString = widthMethodStrings[args.widthMethod]
 
         if useBezierOutline:
-            pen = SegmentPen(font.glyphSet, logger)
-            font.glyphSet[glyph.name()].draw(pen)
-            outline = BOutline(self.scaleContours(pen.contours))
+            def drawContours():
+                pen = SegmentPen(glyphSet, logger)
+                glyphSet[glyphName].draw(pen)
+                return self.scaleContours(pen.contours)
+
+            if self._outlineCache:
+                cache = self._outlineCache
+                key = cache.keyFor(args.fontFile, self._font.faceNumber, glyphName, "scaled")
+                outline = BOutline(cache.getContours(key, drawContours))
+            else:
+                outline = BOutline(drawContours())
         else:
-            spen = SVGPathPen(font.glyphSet, logger)
-            font.glyphSet[glyph.name()].draw(spen)
+            spen = SVGPathPen(glyphSet, logger)
+            glyphSet[glyph.name()].draw(spen)
             scaled = self.scaleContours(spen.outline)
             outline = SVGPathOutline.fromContours(scaled)
 
         self.outline = outline
-
-        contourCount = len(outline.contours)
-        if contourCount > 3:
-            print(f"{indent}(this glyph has {contourCount} contours, so results may not be useful)")
+        result = RasterSamplingResult(fullName, glyphName, outline)
 
         outlineBounds = outline.boundsRectangle
-        outlineBoundsLeft = outlineBounds.left if outlineBounds.left >= 0 else 0
-        outlineBoundsCenter = outlineBoundsLeft + outlineBounds.width / 2
 
         curveList = []
 
@@ -315,81 +395,49 @@ class RasterSamplingTest(object):
                 curveList.append(curve)
 
         overallBounds = baselineBounds.union(outlineBounds)
-        cp = ContourPlotter.ContourPlotter(overallBounds.points)
-
-        # Make room for two lines in the content margins
-        cp._contentMargins.top *= 2
-        cp._contentMargins.bottom *= 2
-
-        # Make sure the content margins are wide enough to
-        # hold the label strings.
-        ctFont = TextUtilities.ctFont(cp.labelFont, cp.labelFontSize)
-        fullNameWidth = TextUtilities.stringWidth(fullName, ctFont)
-        charInfoWidth = TextUtilities.stringWidth(charInfo, ctFont)
-        labelWidth = max(fullNameWidth, charInfoWidth)
-        if labelWidth > overallBounds.width:
-            margin = (labelWidth - overallBounds.width) / 2
-            cp._contentMargins.left = margin
-            cp._contentMargins.right = margin
-        else:
-            margin = cp._contentMargins.left
-
-        cp.pushStrokeAttributes(dash="2,4")
-        cp.drawPointsAsSegments(baseline, color=PathUtilities.GTColor.fromName("cyan"))
-        cp.drawContours([outlineBounds.contour], color=PathUtilities.GTColor.fromName("magenta"))
-        cp.popStrokeAtributes()
-
-        cp.drawPaths(outline)
-
-        cp.drawText(outlineBoundsCenter + margin, cp._labelFontSize * 2, "center", fullName)
-        cp.drawText(outlineBoundsCenter + margin, cp._labelFontSize / 4, "center", charInfo)
-
-        if args.widthMethod == RasterSamplingTestArgs.widthMethodLeftmost:
-            p2function = self.leftmostIntersection
-        elif args.widthMethod == RasterSamplingTestArgs.widthMethodRightmost:
-            p2function = self.rightmostIntersection
+        result.baseline = baseline
+        result.overallBounds = overallBounds
 
         doLeft, doRight = widthSelection[args.widthMethod]
 
         rastersLeft = []
         rastersRight = []
-        missedRasterCount = 0
         height = outlineBounds.height
         lowerBound = round(outlineBounds.bottom + height * .30)
         upperBound = round(outlineBounds.bottom + height * .70)
         interval = round(height * .02)
         left, _, right, _ = overallBounds.points
-        for y in range(lowerBound, upperBound, interval):
+        ys = range(lowerBound, upperBound, interval)
+        scanlineCrossings = ScanlineIntersector(curveList).crossings(ys)
+        for y, crossings in zip(ys, scanlineCrossings):
             p1 = outline.xyPoint(left, y)
             p2 = outline.xyPoint(right, y)
             raster = outline.segmentFromPoints([p1, p2])
 
-            curvesAtY = self.curvesAtY(curveList, y)
-            if len(curvesAtY) == 0:
-                missedRasterCount += 1
+            if len(crossings) == 0:
+                result.missedRasterCount += 1
                 continue
 
-            intersections = [c.intersectWithLine(raster) for c in curvesAtY]
-
-            leftmostCurve = self.leftmostPoint(intersections, outline)
-            p1 = intersections[leftmostCurve]
-            direction = oppositeDirection[self.direction(curvesAtY[leftmostCurve])]
+            # the crossings are sorted by x, so the first one is the leftmost
+            x1, _, leftmostDirection = crossings[0]
+            p1 = outline.xyPoint(x1, y)
+            direction = oppositeDirection[leftmostDirection]
 
             missedLeft = missedRight = False
 
             if doLeft:
-                p2 = self.leftmostIntersection(intersections, curvesAtY, direction)
+                x2 = self.leftmostCrossing(crossings, direction)
 
-                if p1 != p2:
-                    rastersLeft.append(outline.segmentFromPoints([p1, p2]))
+                if x2 is not None and x2 != x1:
+                    rastersLeft.append(outline.segmentFromPoints([p1, outline.xyPoint(x2, y)]))
                 else:
                     missedLeft = True
 
             if doRight:
-                p2 = self.rightmostIntersection(intersections, curvesAtY, direction)
+                x2 = self.rightmostCrossing(crossings, direction)
 
-                if p1 != p2:
-                    rastersRight.append(outline.segmentFromPoints([p1, p2]))
+                if x2 is not None and x2 != x1:
+                    rastersRight.append(outline.segmentFromPoints([p1, outline.xyPoint(x2, y)]))
                 else:
                     missedRight = True
 
@@ -397,7 +445,7 @@ class RasterSamplingTest(object):
             #     missedRasterCount += 1
             #     continue
 
-            cp.drawPaths([outline.pathFromSegments(raster)], color=PathUtilities.GTColor.fromName("red"))
+            result.scanlines.append(raster)
 
         if doLeft and doRight:
             widthsL, midpointsL, bL, aL, rValueL, pValueL, stdErrL = self.bestFit(rastersLeft, outline)
@@ -414,44 +462,246 @@ class RasterSamplingTest(object):
         else:
             rasters = rastersLeft if doLeft else rastersRight
             chosenWidthMethod = "Left" if doLeft else "Right"
-            widths, midpoints, b, a, rValue, pValue, strErr = self.bestFit(rasters, outline)
-
-        r2 = rValue * rValue
-
-        for raster in rasters:
-            cp.drawPointsAsCircles(raster.controlPoints, 4, [PathUtilities.GTColor.fromName("blue")])
+            widths, midpoints, b, a, rValue, pValue, stdErr = self.bestFit(rasters, outline)
 
-        for midpoint in midpoints:
-            cp.drawPointsAsCircles([midpoint], 4, [PathUtilities.GTColor.fromName("green")])
+        result.rasters = rasters
+        result.widthMethod = chosenWidthMethod
+        result.widths = widths
+        result.midpoints = midpoints
+        result.a, result.b = a, b
+        result.r2 = rValue * rValue
+        result.pValue = pValue
+        result.stdErr = stdErr
 
         my0 = outlineBounds.bottom
         myn = outlineBounds.top
-        cp.pushStrokeAttributes(width=2, opacity=0.25, color=PathUtilities.GTColor.fromName("green"))
 
         # x = by + a
         p1 = outline.xyPoint(my0 * b + a, my0)
         p2 = outline.xyPoint(myn * b + a, myn)
-        line = outline.segmentFromPoints([p1, p2])
-        cp.drawPaths([outline.pathFromSegments(line)])
+        result.strokeLine = outline.segmentFromPoints([p1, p2])
+        result.strokeAngle = round(PathUtilities.slopeAngle(result.strokeLine.controlPoints), 1)
+
+        result.meanWidth = round(statistics.mean(widths), 2)
+        quartiles = statistics.quantiles(widths, n=4, method="inclusive")
+        result.q1 = round(quartiles[0], 2)
+        result.median = round(quartiles[1], 2)
+        result.q3 = round(quartiles[2], 2)
+        result.minWidth = round(min(widths), 2)
+        result.maxWidth = round(max(widths), 2)
+
+        return result
+
+    def report(self, result, indent=""):
+        """\
+        Print the results of the test.
+        """
+        contourCount = len(result.outline.contours)
+        if contourCount > 3:
+            print(f"{indent}(this glyph has {contourCount} contours, so results may not be useful)")
+
+        if result.missedRasterCount > 0:
+            print(f"{result.missedRasterCount} rasters did not intersect the glyph.")
+
+        print(f"{indent}{result.widthMethod}: a = {round(result.a, 2)}, b = {round(result.b, 4)}, R\u00B2 = {round(result.r2, 4)}")
+        print(f"{indent}angle = {result.strokeAngle}\u00B0")
+        print(f"{indent}widths: min = {result.minWidth}, Q1 = {result.q1}, median = {result.median}, mean = {result.meanWidth}, Q3 = {result.q3}, max = {result.maxWidth}")
+
+    def run(self, args=None, indent=""):
+        """\
+        Test one glyph and print the results. Unless the arguments ask for
+        metrics only, also write an SVG file with a diagram of the rasters
+        and plots of the stroke widths. Returns a RasterSamplingResult,
+        with the time taken by each step.
+
+        args selects the glyph, and defaults to the arguments the test was created with.
+        """
+        args = args or self._args
+        runStart = time.perf_counter()
+
+        result = self.measure(args)
+        result.measureSeconds = time.perf_counter() - runStart
+
+        self.report(result, indent)
+
+        if not args.metricsOnly:
+            start = time.perf_counter()
+            self.render(result, args)
+            result.renderSeconds = time.perf_counter() - start
+
+        result.totalSeconds = time.perf_counter() - runStart
+        return result
+
+    def glyphNamesWithOutlines(self):
+        """\
+        Return the names of all the glyphs in the font that have
+        at least one contour, either directly or from a component.
+        """
+        glyphSet = self._glyphSet
+        glyphNames = []
+        for glyphName in glyphSet.keys():
+            pen = ControlBoundsPen(glyphSet)
+            glyphSet[glyphName].draw(pen)
+            if pen.bounds is not None: glyphNames.append(glyphName)
+
+        return glyphNames
+
+    def glyphArgs(self):
+        """\
+        Return a list of arguments, one for each glyph to test. For a single
+        glyph, this is the arguments the test was created with. Otherwise, each
+        is a copy of them with the glyph name, glyph ID or character code set.
+        """
+        args = self._args
+        if args.allGlyphs:
+            glyphSpecs = [("glyphName", glyphName) for glyphName in self.glyphNamesWithOutlines()]
+        elif args.glyphSpecs:
+            glyphSpecs = args.glyphSpecs
+        else:
+            return [args]
+
+        glyphArgs = []
+        for attribute, value in glyphSpecs:
+            ga = copy.copy(args)
+            ga.glyphName = ga.glyphID = ga.charCode = None
+            setattr(ga, attribute, value)
+            glyphArgs.append(ga)
+
+        return glyphArgs
+
+    def runGlyphs(self, sink=None):
+        """\
+        Test each of the glyphs selected by the arguments, with the same font.
+        A glyph that fails doesn't stop the others from being tested.
+        Returns a list of the records of the results, one for each glyph.
+        If sink is a ResultsSink, each record is also written to it as soon
+        as its glyph is done.
+        """
+        args = self._args
+        indent = ""
+
+        if args.silent:
+            indent = "    "
+            fullName = self._font.fullName
+            print(f"{indent}{fullName[1:] if fullName.startswith('.') else fullName}:")
+
+        glyphArgs = self.glyphArgs()
+        multiple = args.allGlyphs or args.glyphSpecs
+
+        records = []
+        for ga in glyphArgs:
+            glyphIndent = indent
+            if multiple:
+                if ga.glyphName is not None: label = ga.glyphName
+                elif ga.glyphID is not None: label = f"gid{ga.glyphID}"
+                else: label = f"U+{ga.charCode:04X}"
+                print(f"{indent}{label}:")
+                glyphIndent += "    "
+
+            start = time.perf_counter()
+            try:
+                result = self.run(ga, glyphIndent)
+                record = RasterSamplingResult.record(ga, result)
+            except Exception as error:
+                # a single glyph fails the same way it always has
+                if not multiple: raise
+
+                print(f"{glyphIndent}Failed: {type(error).__name__}: {error}")
+                if args.debug: traceback.print_exc()
+                record = RasterSamplingResult.record(ga, error=error, totalSeconds=time.perf_counter() - start)
+
+            if args.silent or multiple: print()
+
+            records.append(record)
+            if sink: sink.write(record)
+
+        return records
+
+    def render(self, result, args=None):
+        """\
+        Write an SVG file with a diagram of the rasters and
+        plots of the stroke widths in result.
+        """
+        # the drawing and plotting modules are only needed here,
+        # so a metrics only run doesn't have to load them
+        import xml.etree.ElementTree as ET
+        import matplotlib
+        import matplotlib.pyplot as plt
+        import statsmodels.api
+        import CharNames  # From UnicodeData...
+        import ContourPlotter
+        import TextUtilities
+
+        widthMethodStrings = {
+            RasterSamplingTestArgs.widthMethodLeftmost: "",
+            RasterSamplingTestArgs.widthMethodRightmost: "_rightmost",
+            RasterSamplingTestArgs.widthMethodLeastspread: "_leastspread"
+        }
+
+        args = args or self._args
+        font = self._font
+        outline = result.outline
+        fullName = result.fontName
+        glyphName = result.glyphName
+        chosenWidthMethod = result.widthMethod
+        r2 = result.r2
+        line = result.strokeLine
+        strokeAngle = result.strokeAngle
+        minWidth, q1, median, avgWidth, q3, maxWidth = \
+            result.minWidth, result.q1, result.median, result.meanWidth, result.q3, result.maxWidth
+        widths = list(result.widths)
+
+        charCode = font.unicodeForName(glyphName)
+        charInfo = f"U+{charCode:04X} {CharNames.CharNames.getCharName(charCode)}"
+
+        widthMethodString = widthMethodStrings[args.widthMethod]
+
+        outlineBounds = outline.boundsRectangle
+        outlineBoundsLeft = outlineBounds.left if outlineBounds.left >= 0 else 0
+        outlineBoundsCenter = outlineBoundsLeft + outlineBounds.width / 2
+        overallBounds = result.overallBounds
+
+        cp = ContourPlotter.ContourPlotter(overallBounds.points)
+
+        # Make room for two lines in the content margins
+        cp._contentMargins.top *= 2
+        cp._contentMargins.bottom *= 2
+
+        # Make sure the content margins are wide enough to
+        # hold the label strings.
+        ctFont = TextUtilities.ctFont(cp.labelFont, cp.labelFontSize)
+        fullNameWidth = TextUtilities.stringWidth(fullName, ctFont)
+        charInfoWidth = TextUtilities.stringWidth(charInfo, ctFont)
+        labelWidth = max(fullNameWidth, charInfoWidth)
+        if labelWidth > overallBounds.width:
+            margin = (labelWidth - overallBounds.width) / 2
+            cp._contentMargins.left = margin
+            cp._contentMargins.right = margin
+        else:
+            margin = cp._contentMargins.left
+
+        cp.pushStrokeAttributes(dash="2,4")
+        cp.drawPointsAsSegments(result.baseline, color=PathUtilities.GTColor.fromName("cyan"))
+        cp.drawContours([outlineBounds.contour], color=PathUtilities.GTColor.fromName("magenta"))
         cp.popStrokeAtributes()
 
-        if missedRasterCount > 0:
-            print(f"{missedRasterCount} rasters did not intersect the glyph.")
+        cp.drawPaths(outline)
 
-        print(f"{indent}{chosenWidthMethod}: a = {round(a, 2)}, b = {round(b, 4)}, R\u00B2 = {round(r2, 4)}")
+        cp.drawText(outlineBoundsCenter + margin, cp._labelFontSize * 2, "center", fullName)
+        cp.drawText(outlineBoundsCenter + margin, cp._labelFontSize / 4, "center", charInfo)
 
-        strokeAngle = round(PathUtilities.slopeAngle(line.controlPoints), 1)
+        for raster in result.scanlines:
+            cp.drawPaths([outline.pathFromSegments(raster)], color=PathUtilities.GTColor.fromName("red"))
 
-        avgWidth = round(statistics.mean(widths), 2)
-        quartiles = statistics.quantiles(widths, n=4, method="inclusive")
-        q1 = round(quartiles[0], 2)
-        median = round(quartiles[1], 2)
-        q3 = round(quartiles[2], 2)
-        minWidth = round(min(widths), 2)
-        maxWidth = round(max(widths), 2)
-        print(f"{indent}angle = {strokeAngle}\u00B0")
-        print(f"{indent}widths: min = {minWidth}, Q1 = {q1}, median = {median}, mean = {avgWidth}, Q3 = {q3}, max = {maxWidth}")
-        if args.silent: print()
+        for raster in result.rasters:
+            cp.drawPointsAsCircles(raster.controlPoints, 4, [PathUtilities.GTColor.fromName("blue")])
+
+        for midpoint in result.midpoints:
+            cp.drawPointsAsCircles([midpoint], 4, [PathUtilities.GTColor.fromName("green")])
+
+        cp.pushStrokeAttributes(width=2, opacity=0.25, color=PathUtilities.GTColor.fromName("green"))
+        cp.drawPaths([outline.pathFromSegments(line)])
+        cp.popStrokeAtributes()
 
         cp.pushStrokeAttributes(width=2, opacity=0.25, color=PathUtilities.GTColor.fromName("orange"))
         leftLine, rightLine = self.medianLines(line, median)
@@ -561,8 +811,12 @@ def main():
         print(programName + ": " + str(error), file=stderr)
         exit(1)
 
-    test = RasterSamplingTest(args)
-    test.run()
+    with RasterSamplingTest(args) as test:
+        if args.resultsFile:
+            with ResultsSink.forFile(args.resultsFile, RasterSamplingResult.fields) as sink:
+                test.runGlyphs(sink)
+        else:
+            test.runGlyphs()
 
 if __name__ == "__main__":
     main()
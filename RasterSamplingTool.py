@@ -8,14 +8,26 @@ Created on February 5, 2021
 
 import os
 import pathlib
+import time
+import struct
+import traceback
+from io import StringIO
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from sys import argv, exit, stderr
 from TestArgumentIterator import TestArgs
+from ResultsSink import ResultsSink
 import RasterSamplingTest
 
 class RasterSamplingToolArgs(TestArgs):
     def __init__(self):
         self.inputDir = ""
         self.outputDir = ""
+        self.workers = 1
+        self.metricsOnly = False
+        self.resultsFile = None
+        self.glyphSpecs = None
+        self.allGlyphs = False
         TestArgs.__init__(self)
 
     @classmethod
@@ -30,9 +42,59 @@ class RasterSamplingToolArgs(TestArgs):
             self.inputDir = arguments.nextExtra("input directory")
         elif argument == "--output":
             self.outputDir = arguments.nextExtra("output directory")
+        elif argument == "--workers":
+            self.workers = arguments.nextExtraAsPosInt("workers")
+        elif argument == "--metrics":
+            self.metricsOnly = True
+        elif argument == "--results":
+            self.resultsFile = arguments.nextExtra("results file")
+        elif argument == "--glyphs":
+            self.glyphSpecs = RasterSamplingTest.RasterSamplingTestArgs.getGlyphSpecs(arguments.getGlyphList())
+        elif argument == "--allGlyphs":
+            self.allGlyphs = True
         else:
             TestArgs.processArgument(self, argument, arguments)
 
+    def completeInit(self):
+        if not (self.glyphSpecs or self.allGlyphs):
+            TestArgs.completeInit(self)
+
+
+def faceCount(fontFile):
+    """\
+    Return the number of fonts in the given font file.
+    """
+    if not fontFile.endswith((".ttc", ".otc")): return 1
+
+    with open(fontFile, "rb") as file:
+        tag, _, numFonts = struct.unpack(">4sLL", file.read(12))
+
+    return numFonts if tag == b"ttcf" else 1
+
+def runTest(testArgs):
+    """\
+    Run the raster sampling test described by testArgs.
+    Returns a tuple of the test's output and a list of records
+    of the results for a ResultsSink.
+
+    This is run in the worker processes, so the output is
+    captured and returned to be printed in the right order.
+    """
+    output = StringIO()
+    start = time.perf_counter()
+
+    with redirect_stdout(output):
+        try:
+            with RasterSamplingTest.RasterSamplingTest(testArgs) as test:
+                records = test.runGlyphs()
+        except Exception as error:
+            print(f"Failed: {type(error).__name__}: {error}")
+            if testArgs.debug: traceback.print_exc(file=output)
+            print()
+            records = [RasterSamplingTest.RasterSamplingResult.record(testArgs, error=error,
+                                                                      totalSeconds=time.perf_counter() - start)]
+
+    return output.getvalue(), records
 
 def main():
     argumentList = argv
@@ -48,37 +110,65 @@ def main():
         print(programName + ": " + str(error), file=stderr)
         exit(1)
 
-    testCount = failedCount = 0
-    for path in pathlib.Path(toolArgs.inputDir).rglob("*.[ot]t[cf]"):
-        testArgs = RasterSamplingTest.RasterSamplingTestArgs()
-        testArgs.fontFile = str(path)
-        testArgs.fontNumber = 0
-        testArgs.glyphName = toolArgs.glyphName
-        testArgs.glyphID = toolArgs.glyphID
-        testArgs.charCode = toolArgs.charCode
+    tasks = []
+    for path in sorted(pathlib.Path(toolArgs.inputDir).rglob("*.[ot]t[cf]")):
+        fontFile = str(path)
         reldir = os.path.dirname(os.path.relpath(path, os.path.dirname(toolArgs.inputDir)))
-        testArgs.outdir = os.path.join(toolArgs.outputDir, reldir)
-        testArgs.widthMethod = RasterSamplingTest.RasterSamplingTestArgs.widthMethodLeastspread
-        testArgs.silent = True
-        os.makedirs(testArgs.outdir, exist_ok=True)
-
-        print(f"{os.path.relpath(path, toolArgs.inputDir)}:")
-
-        while True:
-            try:
-                test = RasterSamplingTest.RasterSamplingTest(testArgs)
-                test.run()
-            except StopIteration:
-                break
-            except:
-                failedCount += 1
-                print("Failed\n")
-
-            testCount += 1
-            if not testArgs.fontFile.endswith(".ttc"): break
-            testArgs.fontNumber += 1
-
-    print(f"{testCount} tests, {failedCount} failures.")
+        outdir = os.path.join(toolArgs.outputDir, reldir)
+        os.makedirs(outdir, exist_ok=True)
+
+        try:
+            fontCount = faceCount(fontFile)
+        except (OSError, struct.error):
+            fontCount = 1  # let the test report the problem
+
+        for fontNumber in range(fontCount):
+            testArgs = RasterSamplingTest.RasterSamplingTestArgs()
+            testArgs.fontFile = fontFile
+            testArgs.fontNumber = fontNumber
+            testArgs.glyphName = toolArgs.glyphName
+            testArgs.glyphID = toolArgs.glyphID
+            testArgs.charCode = toolArgs.charCode
+            testArgs.debug = toolArgs.debug
+            testArgs.cacheDir = toolArgs.cacheDir
+            testArgs.outdir = outdir
+            testArgs.widthMethod = RasterSamplingTest.RasterSamplingTestArgs.widthMethodLeastspread
+            testArgs.silent = True
+            testArgs.metricsOnly = toolArgs.metricsOnly
+            testArgs.glyphSpecs = toolArgs.glyphSpecs
+            testArgs.allGlyphs = toolArgs.allGlyphs
+            tasks.append(testArgs)
+
+    def report(results, sink):
+        testCount = failedCount = 0
+
+        # results are in the same order as tasks, so
+        # the output is the same as a serial run.
+        for testArgs, (output, records) in zip(tasks, results):
+            if testArgs.fontNumber == 0:
+                print(f"{os.path.relpath(testArgs.fontFile, toolArgs.inputDir)}:")
+            print(output, end="", flush=True)
+
+            for record in records:
+                if sink: sink.write(record)
+
+                testCount += 1
+                if record["error"] is not None: failedCount += 1
+
+        print(f"{testCount} tests, {failedCount} failures.")
+
+    sink = None
+    if toolArgs.resultsFile:
+        sink = ResultsSink.forFile(toolArgs.resultsFile, RasterSamplingTest.RasterSamplingResult.fields)
+
+    try:
+        if toolArgs.workers > 1:
+            with ProcessPoolExecutor(max_workers=toolArgs.workers) as executor:
+                report(executor.map(runTest, tasks), sink)
+        else:
+            report(map(runTest, tasks), sink)
+    finally:
+        if sink: sink.close()
 
 if __name__ == "__main__":
     main()
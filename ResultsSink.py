@@ -0,0 +1,108 @@
+"""\
+Write test results as JSON Lines or CSV records
+
+Created on October 17, 2026
+
+@author Eric Mader
+"""
+
+import os
+import csv
+import json
+import math
+from abc import ABC, abstractmethod
+
+class ResultsSink(ABC):
+    """\
+    A destination for result records. Each record is a dictionary
+    with a fixed set of fields. Records are written and flushed one
+    at a time, so the file can be read while a long run is going.
+    """
+    def __init__(self, file, fields):
+        self._file = file
+        self._fields = fields
+
+    @classmethod
+    def forFile(cls, path, fields):
+        """\
+        Return a sink that writes to path. The format is chosen by the
+        file's extension: “.csv” for CSV, otherwise JSON Lines.
+        """
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+
+        file = open(path, "w", newline="", encoding="utf-8")
+        if path.endswith(".csv"):
+            return CSVResultsSink(file, fields)
+
+        return JSONLinesResultsSink(file, fields)
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @abstractmethod
+    def _writeRecord(self, record):
+        """\
+        Write record, which has exactly the sink's fields, in the sink's format.
+        """
+
+    def write(self, record):
+        """\
+        Write record. Fields that aren't in the record are written as empty values,
+        and fields that aren't in the sink's list of fields are ignored.
+        """
+        self._writeRecord({field: record.get(field) for field in self._fields})
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+class JSONLinesResultsSink(ResultsSink):
+    """\
+    Writes each record as a JSON object on its own line.
+    Values that aren't finite numbers are written as null.
+    """
+    @classmethod
+    def _jsonValue(cls, value):
+        if isinstance(value, float) and not math.isfinite(value): return None
+        return value
+
+    def _writeRecord(self, record):
+        record = {field: self._jsonValue(value) for field, value in record.items()}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+class CSVResultsSink(ResultsSink):
+    """\
+    Writes the records as rows of a CSV file with a header row.
+    """
+    def __init__(self, file, fields):
+        ResultsSink.__init__(self, file, fields)
+        self._writer = csv.DictWriter(file, fieldnames=fields)
+        self._writer.writeheader()
+
+    def _writeRecord(self, record):
+        self._writer.writerow(record)
+
+def test():
+    import tempfile
+
+    fields = ["name", "value", "error"]
+    records = [{"name": "one", "value": 1.5}, {"name": "two", "value": math.nan, "error": "failed"}]
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ["results.jsonl", "results.csv"]:
+            path = os.path.join(directory, name)
+            with ResultsSink.forFile(path, fields) as sink:
+                for record in records: sink.write(record)
+
+            with open(path) as file:
+                print(file.read())
+
+if __name__ == "__main__":
+    test()
@@ -258,7 +258,7 @@ class SVGPathContour(MutableSequence):
         bounds = PathUtilities.GTBoundsRectangle()
 
         for segment in self._segments:
-            bounds = bounds.union(segment.boundsRectangle)
+            bounds.unionInPlace(segment.boundsRectangle)
 
         return bounds
 
@@ -353,6 +353,6 @@ class SVGPathOutline(MutableSequence):  # maybe take font, glyph name and constr
         bounds = PathUtilities.GTBoundsRectangle()
 
         for contour in self._contours:
-            bounds = bounds.union(contour.boundsRectangle)
+            bounds.unionInPlace(contour.boundsRectangle)
 
         return bounds
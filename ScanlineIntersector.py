@@ -0,0 +1,123 @@
+"""\
+Find where horizontal scanlines cross the curves of an outline
+
+Created on October 17, 2026
+
+@author Eric Mader
+"""
+
+import bisect
+import BezierUtilities as butils
+from Bezier import Bezier
+
+class ScanlineIntersector(object):
+    """\
+    Finds all the places where a set of horizontal scanlines cross a list of curves.
+
+    The curves are kept in an edge table sorted by their lowest y coordinate.
+    The scanlines are processed from bottom to top, with a list of the active
+    curves whose y range includes the current scanline. Each active curve is
+    intersected with the scanline by solving y(t) = y directly, so there's no
+    need to rotate the curve to align it with the scanline.
+    """
+    def __init__(self, curves):
+        edges = []
+        for index, curve in enumerate(curves):
+            points = [curve.pointXY(p) for p in curve.controlPoints]
+            xs = [float(x) for x, _ in points]
+            ys = [float(y) for _, y in points]
+            edges.append((min(ys), max(ys), index, xs, ys))
+
+        edges.sort(key=lambda e: e[0])
+        self._edges = edges
+        self._edgeStarts = [e[0] for e in edges]
+
+    @classmethod
+    def _bernstein(cls, values, t):
+        mt = 1 - t
+        order = len(values) - 1
+        if order == 1:
+            a, b = values
+            return mt * a + t * b
+
+        if order == 2:
+            a, b, c = values
+            return mt * mt * a + 2 * mt * t * b + t * t * c
+
+        if order == 3:
+            a, b, c, d = values
+            mt2 = mt * mt
+            t2 = t * t
+            return mt2 * mt * a + 3 * mt2 * t * b + 3 * mt * t2 * c + t2 * t * d
+
+        # higher order curves: use de Casteljau's computation
+        while len(values) > 1:
+            values = [v0 + (v1 - v0) * t for v0, v1 in zip(values, values[1:])]
+        return values[0]
+
+    @classmethod
+    def _derivative(cls, values, t):
+        order = len(values) - 1
+        deltas = [order * (v1 - v0) for v0, v1 in zip(values, values[1:])]
+        return deltas[0] if order == 1 else cls._bernstein(deltas, t)
+
+    @classmethod
+    def _crossings(cls, edge, y):
+        yMin, yMax, index, xs, ys = edge
+
+        # a horizontal line that lies on the scanline doesn't cross it
+        if yMin == yMax: return []
+
+        crossings = []
+        for t in butils.roots([py - y for py in ys]):
+            t = 0 if t < 0 else 1 if t > 1 else t
+            dy = cls._derivative(ys, t)
+            if dy == 0: dy = ys[-1] - ys[0]
+            direction = Bezier.dir_up if dy > 0 else Bezier.dir_down if dy < 0 else Bezier.dir_flat
+            crossings.append((cls._bernstein(xs, t), index, direction))
+
+        return crossings
+
+    def crossings(self, ys):
+        """\
+        Return a list with an entry for each y coordinate in ys. Each entry is a list
+        of (x, curve index, direction) tuples, one for each place where the scanline
+        crosses a curve, sorted by x. The direction is Bezier.dir_up or Bezier.dir_down,
+        depending on whether the curve is moving up or down where it crosses the scanline.
+
+        A scanline that passes through a point where two curves meet crosses both curves.
+        """
+        results = [[] for _ in ys]
+        active = []
+        nextEdge = 0
+        edgeCount = len(self._edges)
+
+        for i in sorted(range(len(ys)), key=lambda i: ys[i]):
+            y = ys[i]
+
+            # add the edges that start at or below this scanline
+            end = bisect.bisect_right(self._edgeStarts, y, lo=nextEdge)
+            active.extend(self._edges[nextEdge:end])
+            nextEdge = end
+
+            # and remove the ones that end below it
+            active = [edge for edge in active if edge[1] >= y]
+
+            crossings = results[i]
+            for edge in active:
+                crossings.extend(self._crossings(edge, y))
+            crossings.sort(key=lambda c: c[0])
+
+            if nextEdge == edgeCount and len(active) == 0: break
+
+        return results
+
+def test():
+    curves = [Bezier([(0, 0), (100, 0)]), Bezier([(100, 0), (150, 50), (100, 100)]),
+              Bezier([(100, 100), (60, 140), (20, 60), (0, 100)]), Bezier([(0, 100), (0, 0)])]
+    ys = [50, 0, 90, 120]
+    for y, crossings in zip(ys, ScanlineIntersector(curves).crossings(ys)):
+        print(f"y = {y}: {crossings}")
+
+if __name__ == "__main__":
+    test()
@@ -6,12 +6,40 @@ Created on October 14, 2020
 @author Eric Mader
 """
 
+import weakref
 import PathUtilities
 
+# component caches for each glyph set, keyed by id(glyphSet)
+_componentCaches = {}
+
+def componentCacheFor(glyphSet):
+    """\
+    Return the component cache for the given glyph set. This is a dictionary
+    that maps glyph names to the contours of the glyph, as they are
+    drawn when the glyph is used as a component.
+
+    The cache goes away when the glyph set does. If the glyph set can't
+    be weakly referenced, a new cache is returned, which only lasts as
+    long as the pen that uses it.
+    """
+    key = id(glyphSet)
+    entry = _componentCaches.get(key)
+    if entry and entry[0]() is glyphSet: return entry[1]
+
+    cache = {}
+    try:
+        ref = weakref.ref(glyphSet, lambda _: _componentCaches.pop(key, None))
+    except TypeError:
+        return cache
+
+    _componentCaches[key] = (ref, cache)
+    return cache
+
 class SegmentPen:
-    def __init__(self, glyphSet, logger):
+    def __init__(self, glyphSet, logger, componentCache=None):
         self._contours = []
         self._glyphSet = glyphSet
+        self._componentCache = componentCache
         self.logger = logger
 
     def addPoint(self, pt, segmentType, smooth, name):
@@ -76,8 +104,32 @@ class SegmentPen:
 
     identityTransformation = (1, 0, 0, 1, 0, 0)
 
+    def componentContours(self, glyphName):
+        """\
+        Return the contours of the named glyph, with all of its components resolved,
+        and the points of those contours as an array. The results are cached for
+        the glyph set, so each glyph is only drawn once, no matter how many glyphs
+        use it as a component.
+        """
+        if self._componentCache is None:
+            self._componentCache = componentCacheFor(self._glyphSet)
+
+        cached = self._componentCache.get(glyphName)
+        if cached is None:
+            glyph = self._glyphSet[glyphName]
+            cpen = SegmentPen(self._glyphSet, self.logger, self._componentCache)
+            glyph.draw(cpen)
+            contours = cpen.contours
+            points, shape = PathUtilities.contoursToArray(contours)
+            cached = (contours, points, shape)
+            self._componentCache[glyphName] = cached
+
+        return cached
+
     def addComponent(self, glyphName, transformation):
         self.logger.debug(f"addComponent(\"{glyphName}\", {transformation}")
+        contours, points, shape = self.componentContours(glyphName)
+
         if transformation != self.identityTransformation:
             xScale, xyScale, yxScale, yScale, xOffset, yOffset = transformation
             m = PathUtilities.GTTransform._matrix(
@@ -89,14 +141,10 @@ class SegmentPen:
                 n=yOffset
             )
             t = PathUtilities.GTTransform(m)
+            self.contours.extend(PathUtilities.contoursFromArray(t.applyToArray(points), shape))
         else:
-            t = None
-
-        glyph = self._glyphSet[glyphName]
-        cpen = SegmentPen(self._glyphSet, self.logger)
-        glyph.draw(cpen)
-        contours = t.applyToContours(cpen.contours) if t else cpen.contours
-        self.contours.extend(contours)
+            # copy the cached contours so that changes to ours don't change them
+            self.contours.extend([[list(segment) for segment in contour] for contour in contours])
 
     @property
     def contours(self):
@@ -65,6 +65,7 @@ class TestArgs:
         self.glyphName = None
         self.glyphID = None
         self.charCode = None
+        self.cacheDir = None
         # self.steps = 20
 
     @classmethod
@@ -101,6 +102,8 @@ class TestArgs:
                 self.glyphID = TestArgs.getGlyphID(extra[3:])
         # elif argument == "--steps":
         #     self.steps = arguments.nextExtraAsPosInt("steps")
+        elif argument == "--cache":
+            self.cacheDir = arguments.nextExtra("cache directory")
         elif argument == "--debug":
             self.debug = True
         else:
@@ -15,6 +15,7 @@ class UFOFont(object):
         self._fileInfo = plistlib.load(infoFile)
         self._glyphSet = glifLib.GlyphSet(f"{fileName}/glyphs")
         self._unicodes = self._glyphSet.getUnicodes()
+        self._codesToNames = None
 
     @property
     def fullName(self):
@@ -24,16 +25,51 @@ class UFOFont(object):
     def glyphSet(self):
         return self._glyphSet
 
+    @property
+    def faceNumber(self):
+        # a UFO holds one font
+        return 0
+
+    def close(self):
+        """\
+        The glyphs are read from their files when they're used,
+        so there's nothing to close. This matches GTFont.close().
+        """
+        pass
+
     def glyphForName(self, glyphName):
         return UFOGlyph(glyphName, self)
 
     def glyphForIndex(self, index):
         return None
 
+    def glyphNameForCharacterCode(self, charCode):
+        """\
+        Return the name of the glyph for the given character code, or None if there isn't one.
+        """
+        if self._codesToNames is None:
+            # if more than one glyph has the same code, use the first one
+            codesToNames = {}
+            for name, codes in self._unicodes.items():
+                for code in codes:
+                    codesToNames.setdefault(code, name)
+            self._codesToNames = codesToNames
+
+        return self._codesToNames.get(charCode)
+
     def glyphForCharacter(self, charCode):
-        for name, codes in self._unicodes.items():
-            if charCode in codes: return self.glyphForName(name)
-        return None
+        name = self.glyphNameForCharacterCode(charCode)
+        return self.glyphForName(name) if name is not None else None
+
+    def unicodesForName(self, glyphName):
+        """\
+        Return a list of the character codes of the given glyph.
+        """
+        return self._unicodes.get(glyphName, [])
+
+    def unicodeForName(self, glyphName):
+        codes = self.unicodesForName(glyphName)
+        return codes[0] if codes else None
 
     # Do we really need this?
     def getGlyphContours(self, glyphName, logger):
@@ -14,6 +14,7 @@ import PathUtilities
 from ContourPlotter import ContourPlotter
 from SegmentPen import SegmentPen
 from UFOFont import UFOFont
+from OutlineCache import OutlineCache
 
 class GlifTestArgumentIterator(ArgumentIterator):
     def __init__(self, arguments):
@@ -50,6 +51,7 @@ class GlifTestArgs:
         self.debug = False
         self.fontName = None
         self.glyphList = []
+        self.cacheDir = None
 
     def completeInit(self):
         """\
@@ -90,6 +92,8 @@ class GlifTestArgs:
                 args.fontName = arguments.nextExtra("font")
             elif argument == "--glyph":
                 args.glyphList = arguments.getGlyphList()
+            elif argument == "--cache":
+                args.cacheDir = arguments.nextExtra("cache directory")
             elif argument == "--debug":
                 args.debug = True
             else:
@@ -110,13 +114,21 @@ colorLightGrey = PathUtilities.GTColor.fromName("lightgrey")
 colorLightBlue = PathUtilities.GTColor.fromName("lightblue")
 colorLightGreen = PathUtilities.GTColor.fromName("lightgreen")
 
-def glifOutlineTest(font, glyphName, pen, color=None):
+def glifOutlineTest(font, glyphName, pen, color=None, cache=None, fontFile=None):
     logger = pen.logger
     logger.debug(f"{font.glyphSet.dirName}/{glyphName}.glif")
-    glyph = font.glyphForName(glyphName)
-    pen._contours = []
-    glyph.draw(pen)
-    outline = Bezier.BOutline(pen.contours)
+
+    def drawContours():
+        glyph = font.glyphForName(glyphName)
+        pen._contours = []
+        glyph.draw(pen)
+        return pen.contours
+
+    if cache:
+        contours = cache.getContours(cache.keyFor(fontFile, font.faceNumber, glyphName), drawContours)
+    else:
+        contours = drawContours()
+    outline = Bezier.BOutline(contours)
     bounds = outline.boundsRectangle
 
     cp = ContourPlotter(bounds.points)
@@ -155,9 +167,10 @@ def test():
 
         font = UFOFont(args.fontName)
         pen = SegmentPen(font.glyphSet, logger)
+        cache = OutlineCache(args.cacheDir) if args.cacheDir else None
 
         for glyphName in args.glyphList:
-            glifOutlineTest(font, glyphName, pen, colorBlue)
+            glifOutlineTest(font, glyphName, pen, colorBlue, cache, args.fontName)
 
     except ValueError as error:
         print(programName + ": " + str(error), file=stderr)